@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from api_yamdb.db import check_connections
+
+        from . import signals  # noqa: F401
+        request_started.connect(
+            check_connections, dispatch_uid='check_connections')
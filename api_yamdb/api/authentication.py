@@ -0,0 +1,59 @@
+"""
+Аутентификация по JWT без обращения к таблице пользователей.
+
+Для проверок прав хватает нескольких полей пользователя, поэтому они
+кэшируются на AUTH_USER_CACHE_TIMEOUT секунд. Сохранение и удаление
+пользователя удаляют запись из кэша (см. api/signals.py).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import user_auth_key
+
+AUTH_USER_FIELDS = (
+    'id', 'username', 'role', 'is_superuser', 'is_staff', 'is_active')
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, которая берёт пользователя из кэша.
+
+    Пользователь собирается через from_db только из AUTH_USER_FIELDS,
+    остальные поля отложены и загружаются при первом обращении.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification'))
+
+        # from_db ждёт значения в порядке полей модели.
+        fields = [
+            field.attname for field in self.user_model._meta.concrete_fields
+            if field.attname in AUTH_USER_FIELDS
+        ]
+        key = user_auth_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list(*fields).first()
+            if values is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found')
+            cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+
+        user = self.user_model.from_db(
+            router.db_for_read(self.user_model), fields, values)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,145 @@
+"""
+Счётчики версий данных и версионированный кэш ответов.
+
+Ключ ответа включает счётчики версий: глобальный (жанры и категории),
+версию списков и версию конкретного произведения. Запись в модели
+сдвигает нужные счётчики, и старые ключи просто перестают читаться.
+Счётчик хранит время сдвига в наносекундах, поэтому по тем же версиям
+строятся ETag и Last-Modified.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+GLOBAL_VERSION_KEY = 'titles:version:global'
+LIST_VERSION_KEY = 'titles:version:list'
+TITLE_VERSION_KEY = 'titles:version:title:{}'
+REVIEWS_VERSION_KEY = 'reviews:version:title:{}'
+COMMENTS_VERSION_KEY = 'comments:version:review:{}'
+USERS_VERSION_KEY = 'users:version'
+USER_AUTH_KEY = 'users:auth:{}'
+HITS_KEY = 'titles:stats:hits'
+MISSES_KEY = 'titles:stats:misses'
+
+
+def title_version_key(title_id):
+    return TITLE_VERSION_KEY.format(title_id)
+
+
+def reviews_version_key(title_id):
+    return REVIEWS_VERSION_KEY.format(title_id)
+
+
+def comments_version_key(review_id):
+    return COMMENTS_VERSION_KEY.format(review_id)
+
+
+def user_auth_key(user_id):
+    return USER_AUTH_KEY.format(user_id)
+
+
+def get_versions(*keys):
+    """
+    Возвращает текущие версии, заводя отсутствующие счётчики.
+
+    Счётчики живут CACHE_VERSION_TIMEOUT секунд, иначе ключи для id из
+    адресов несуществующих объектов копились бы бессрочно. Заведённый
+    заново счётчик равен текущему времени, то есть работает как сдвиг.
+    """
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    for key, version in missing.items():
+        cache.add(key, version, settings.CACHE_VERSION_TIMEOUT)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, missing.get(key)) for key in keys]
+
+
+def bump_versions(*keys):
+    cache.set_many(
+        {key: time.time_ns() for key in keys}, settings.CACHE_VERSION_TIMEOUT)
+
+
+def forget_user(user_id):
+    """Удаляет пользователя из кэша аутентификации."""
+    cache.delete(user_auth_key(user_id))
+
+
+def bump_titles(*title_ids):
+    """Сбрасывает кэш списков и карточек указанных произведений."""
+    bump_versions(LIST_VERSION_KEY, *map(title_version_key, title_ids))
+
+
+def bump_catalog():
+    """Сбрасывает весь кэш произведений, например после правки жанра."""
+    bump_versions(GLOBAL_VERSION_KEY)
+
+
+def _request_fingerprint(request):
+    query = sorted(request.query_params.lists())
+    raw = f'{request.scheme}://{request.get_host()}?{query}'
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def title_list_key(request):
+    versions = get_versions(GLOBAL_VERSION_KEY, LIST_VERSION_KEY)
+    return 'titles:list:{}:{}:{}'.format(
+        *versions, _request_fingerprint(request))
+
+
+def title_detail_key(request, title_id, kind='detail'):
+    versions = get_versions(
+        GLOBAL_VERSION_KEY, title_version_key(title_id))
+    return 'titles:{}:{}:{}:{}:{}'.format(
+        kind, title_id, *versions, _request_fingerprint(request))
+
+
+def make_etag(request, versions):
+    """Сильный ETag: версии данных плюс всё, от чего зависит тело ответа."""
+    raw = '{}:{}:{}:{}'.format(
+        request.path,
+        _request_fingerprint(request),
+        request.META.get('HTTP_ACCEPT', ''),
+        ':'.join(map(str, versions))
+    )
+    return '"{}"'.format(hashlib.md5(raw.encode()).hexdigest())
+
+
+def last_modified(versions):
+    """Время последнего сдвига версий в секундах Unix."""
+    return max(versions) // 10 ** 9
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats():
+    stats = cache.get_many((HITS_KEY, MISSES_KEY))
+    return {
+        'hits': stats.get(HITS_KEY, 0),
+        'misses': stats.get(MISSES_KEY, 0),
+    }
+
+
+def cached_response(key, get_response):
+    """Отдаёт ответ из кэша или строит его и сохраняет данные по ключу."""
+    data = cache.get(key)
+    if data is not None:
+        _count(HITS_KEY)
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+    _count(MISSES_KEY)
+    response = get_response()
+    if response.status_code == 200:
+        cache.set(key, response.data, settings.TITLES_CACHE_TIMEOUT)
+    response['X-Cache'] = 'MISS'
+    return response
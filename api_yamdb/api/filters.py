@@ -1,6 +1,8 @@
-from django_filters.rest_framework import CharFilter, FilterSet
+from django_filters.rest_framework import (CharFilter, FilterSet,
+                                           IsoDateTimeFromToRangeFilter,
+                                           NumberFilter)
 
-from reviews.models import Title
+from reviews.models import Comment, Review, Title
 
 
 class FilterTitleSet(FilterSet):
@@ -15,3 +17,25 @@ class FilterTitleSet(FilterSet):
             'name',
             'year'
         )
+
+
+class ReviewExportFilterSet(FilterSet):
+    """Фильтры выгрузки: ?title=, ?category=, ?pub_date_after/before=."""
+    title = NumberFilter('title_id')
+    category = CharFilter('title__category__slug')
+    pub_date = IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Review
+        fields = ('title', 'category', 'pub_date')
+
+
+class CommentExportFilterSet(FilterSet):
+    title = NumberFilter('review__title_id')
+    review = NumberFilter('review_id')
+    category = CharFilter('review__title__category__slug')
+    pub_date = IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Comment
+        fields = ('title', 'review', 'category', 'pub_date')
@@ -0,0 +1,27 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import get_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша эндпоинтов произведений.'
+
+    def handle(self, *args, **options):
+        # Счётчики лежат в самом кэше: в памяти процесса их видит только
+        # обслуживающий запросы процесс, команда прочитала бы нули.
+        if isinstance(caches['default'], (LocMemCache, DummyCache)):
+            raise CommandError(
+                'Кэш не общий для процессов, статистика недоступна: задайте '
+                'CACHE_BACKEND и CACHE_LOCATION общего кэша (Memcached, '
+                'Redis, база данных или файлы).'
+            )
+        stats = get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {ratio:.1%}'
+        )
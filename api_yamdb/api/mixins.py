@@ -1,7 +1,19 @@
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
 from rest_framework.viewsets import GenericViewSet
 
+from api_yamdb.db import check_connections
+from . import cache
+
 
 class CreateDeleteViewSet(
     GenericViewSet,
@@ -10,3 +22,125 @@ class CreateDeleteViewSet(
     DestroyModelMixin
 ):
     pass
+
+
+def read_in_thread(view, request, *args, **kwargs):
+    # У потока из пула своё соединение с базой; оно проверяется и
+    # закрывается по тем же правилам, что и в обычном запросе.
+    close_old_connections()
+    check_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        # Иначе Django отрисует JSON уже в общем потоке. Ответ 304 из
+        # conditional_response — обычный HttpResponse, рисовать нечего.
+        if isinstance(response, SimpleTemplateResponse):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+class AsyncReadMixin:
+    """
+    Асинхронные GET и HEAD под ASGI (ASYNC_READS).
+
+    Django 3.2 выполняет синхронные представления под ASGI в одном общем
+    потоке, и запросы ждут друг друга. Чтения уходят в пул потоков через
+    sync_to_async(thread_sensitive=False) и выполняются параллельно,
+    остальные методы по-прежнему идут через общий поток. Асинхронного ORM
+    в Django 3.2 нет, поэтому сами запросы к базе остаются синхронными.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_READS:
+            return view
+        read = sync_to_async(read_in_thread, thread_sensitive=False)
+        write = sync_to_async(view, thread_sensitive=True)
+
+        @wraps(view)
+        async def async_view(request, *args, **kwargs):
+            if request.method in ('GET', 'HEAD'):
+                return await read(view, request, *args, **kwargs)
+            return await write(request, *args, **kwargs)
+
+        return async_view
+
+
+class ConditionalListMixin:
+    """
+    Проставляет ETag и Last-Modified ответам list и отвечает 304 по
+    If-None-Match/If-Modified-Since до выполнения запросов к базе.
+
+    Наследник перечисляет ключи счётчиков версий в get_version_keys(), а
+    вложенные ресурсы загружают родителя из адреса в check_parent(): без
+    родителя ответ 404, а не 304.
+    """
+
+    def get_version_keys(self):
+        raise NotImplementedError
+
+    def check_parent(self):
+        pass
+
+    def conditional_response(self, request, get_response):
+        self.check_parent()
+        versions = cache.get_versions(*self.get_version_keys())
+        etag = cache.make_etag(request, versions)
+        modified = cache.last_modified(versions)
+        now = int(time.time())
+        since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'))
+        # Last-Modified с точностью до секунды: запись в ту же секунду его
+        # не сдвинет, такой ответ и дату из будущего сравнивать нельзя.
+        validator = modified
+        if modified >= now or (since is not None and since > now):
+            validator = None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=validator)
+        if response is None:
+            response = get_response()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs)
+        )
+
+
+class ConditionalGetMixin(ConditionalListMixin):
+    """То же для list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            lambda: super(ConditionalGetMixin, self).retrieve(
+                request, *args, **kwargs)
+        )
+
+
+class CachedResponseMixin:
+    """Кэширует данные ответов list и retrieve по ключу get_cache_key()."""
+
+    def get_cache_key(self, request):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        return cache.cached_response(
+            self.get_cache_key(request),
+            lambda: super(CachedResponseMixin, self).list(
+                request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return cache.cached_response(
+            self.get_cache_key(request),
+            lambda: super(CachedResponseMixin, self).retrieve(
+                request, *args, **kwargs)
+        )
@@ -0,0 +1,34 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class ViewCursorPagination(CursorPagination):
+    """Курсорная пагинация с порядком из атрибута cursor_ordering view."""
+
+    def get_ordering(self, request, queryset, view):
+        return view.cursor_ordering
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """
+    Номерная пагинация, которая переключается на курсорную при наличии
+    параметра cursor в запросе (первая страница — ?cursor=).
+
+    Курсорный режим не считает COUNT(*) и не использует OFFSET, поэтому
+    стоимость страницы не зависит от её глубины.
+    """
+
+    cursor_query_param = 'cursor'
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_paginator = ViewCursorPagination()
+        self.cursor_paginator.page_size = self.page_size
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
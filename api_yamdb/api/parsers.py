@@ -0,0 +1,39 @@
+"""
+JSON-парсер на orjson.
+
+Тело в UTF-8 разбирает orjson. Всё, что он отвергает (NaN при
+STRICT_JSON=False, ошибки синтаксиса), и другие кодировки разбирает
+стандартный JSONParser: результат и текст ошибки те же. Целые больше 64
+бит orjson молча превращает в float, поэтому тело с 19 цифрами подряд
+тоже разбирает JSONParser. Цифры ищутся через bytes.translate: это на
+порядок быстрее регулярного выражения. Без orjson парсер работает как
+обычный JSONParser.
+"""
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+DIGITS_AS_ZEROS = bytes(
+    ord('0') if chr(byte) in '0123456789' else ord(' ') for byte in range(256))
+LONG_NUMBER = b'0' * 19
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get(
+            'encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_NUMBER not in body.translate(DIGITS_AS_ZEROS):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -32,5 +32,12 @@ class AuthorIsAuthenticatedModeratorAdminSuperuserOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in SAFE_METHODS
-            or obj.author == request.user or request.user.is_moderator
+            or obj.author_id == request.user.id or request.user.is_moderator
             or request.user.is_admin or request.user.is_superuser)
+
+
+class IsModeratorOrAdmin(BasePermission):
+    def has_permission(self, request, view):
+        return (
+            request.user.is_authenticated
+            and (request.user.is_moderator or request.user.is_admin))
@@ -1,8 +1,17 @@
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.aggregates import build_histogram
+from reviews.changes import MODEL_NAMES
+from reviews.moderation import ACTIONS
+from reviews.models import (Category, Change, Comment, Genre, Review, Title,
+                            TitleRanking, User)
+from reviews.rankings import ORDERINGS
+from reviews.signals import bulk_operation, titles_changed
 
 
 class UsersSerializer(serializers.ModelSerializer):
@@ -22,21 +31,35 @@ class UserMeSerializer(serializers.ModelSerializer):
         read_only_fields = ('role',)
 
 
-class CustomUserTokenSerializer(serializers.ModelSerializer):
+class CustomUserTokenSerializer(serializers.Serializer):
+    username = serializers.CharField(max_length=150)
+    confirmation_code = serializers.CharField(max_length=255)
 
-    class Meta:
-        model = User
-        fields = (
-            'username',
-            'confirmation_code'
-        )
+
+def unique_error_message(field_name):
+    """Сообщение, которое DRF выдал бы через UniqueValidator поля."""
+    model_field = User._meta.get_field(field_name)
+    return model_field.error_messages['unique'] % {
+        'model_name': User._meta.verbose_name,
+        'field_label': model_field.verbose_name,
+    }
 
 
 class RegistrationSerializer(serializers.ModelSerializer):
+    """
+    Регистрация или повторный запрос кода.
+
+    Уникальность проверяет create() одним запросом вместо отдельных
+    UniqueValidator для username и email; сообщения об ошибках те же.
+    """
 
     class Meta:
         model = User
         fields = ('email', 'username')
+        extra_kwargs = {
+            'email': {'validators': []},
+            'username': {'validators': [UnicodeUsernameValidator()]},
+        }
 
     def validate_username(self, value):
         if value == 'me':
@@ -44,6 +67,24 @@ class RegistrationSerializer(serializers.ModelSerializer):
                 'Использовать me в качестве поля username нельзя!')
         return value
 
+    def create(self, validated_data):
+        username = validated_data['username']
+        email = validated_data['email']
+        users = User.objects.filter(Q(username=username) | Q(email=email))
+        errors = {}
+        for user in users:
+            if user.username == username and user.email == email:
+                return user
+            if user.email == email:
+                errors['email'] = [unique_error_message('email')]
+            if user.username == username:
+                errors['username'] = [unique_error_message('username')]
+        if errors:
+            raise serializers.ValidationError(
+                {field: errors[field] for field in self.fields
+                 if field in errors})
+        return super().create(validated_data)
+
 
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
@@ -77,17 +118,186 @@ class TitleCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ('id', 'category', 'genre', 'name', 'year', 'description')
+
+
+class TitleBulkListSerializer(serializers.ListSerializer):
+    """
+    Массовое создание и обновление произведений.
+
+    Слаги жанров и категорий, а также обновляемые произведения
+    загружаются одним запросом на каждый тип, запись выполняется
+    bulk-операциями в одной транзакции.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+        items, errors = [], []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                items.append({})
+                errors.append(exc.detail)
+        genres = Genre.objects.in_bulk(
+            {slug for item in items for slug in item.get('genre', ())},
+            field_name='slug'
+        )
+        categories = Category.objects.in_bulk(
+            {item['category'] for item in items if item.get('category')},
+            field_name='slug'
+        )
+        titles = Title.objects.in_bulk(
+            {item['id'] for item in items if 'id' in item})
+        for item, item_errors in zip(items, errors):
+            item_errors.update(
+                self.resolve_item(item, titles, genres, categories))
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def resolve_item(self, item, titles, genres, categories):
+        """Заменяет id и слаги объектами и возвращает ошибки элемента."""
+        errors = {}
+        if 'id' in item:
+            item['instance'] = titles.get(item['id'])
+            if item['instance'] is None:
+                errors['id'] = [f'Произведение с id {item["id"]} не найдено.']
+        if 'genre' in item:
+            missing = [slug for slug in item['genre'] if slug not in genres]
+            if missing:
+                errors['genre'] = [
+                    f'Жанр {slug} не найден.' for slug in missing]
+            item['genre'] = [
+                genres.get(slug) for slug in dict.fromkeys(item['genre'])]
+        if item.get('category'):
+            item['category'] = categories.get(item['category'])
+            if item['category'] is None:
+                errors['category'] = ['Категория не найдена.']
+        return errors
+
+    def create(self, validated_data):
+        fields = ('name', 'year', 'description', 'category')
+        new_titles, updated_titles, genre_links = [], [], []
+        for item in validated_data:
+            title = item.get('instance') or Title()
+            for field in fields:
+                if field in item:
+                    setattr(title, field, item[field])
+            (updated_titles if title.pk else new_titles).append(title)
+            genre_links.append((title, item.get('genre')))
+        # Журнал, кэш и рейтинги обновляет titles_changed, одинаково при
+        # bulk_create и при построчной вставке.
+        with transaction.atomic(), bulk_operation():
+            if connection.features.can_return_rows_from_bulk_insert:
+                Title.objects.bulk_create(new_titles)
+            else:
+                # SQLite в Django 3.2 не возвращает id после bulk_create.
+                for title in new_titles:
+                    title.save(force_insert=True)
+            if updated_titles:
+                Title.objects.bulk_update(updated_titles, fields)
+            through = Title.genre.through
+            replaced = [
+                title.pk for title, genres in genre_links
+                if genres is not None
+            ]
+            through.objects.filter(title_id__in=replaced).delete()
+            through.objects.bulk_create(
+                through(title_id=title.pk, genre_id=genre.pk)
+                for title, genres in genre_links if genres
+                for genre in genres
+            )
+            titles_changed.send(
+                sender=Title,
+                title_ids=[title.pk for title, _ in genre_links],
+                created_ids=[title.pk for title in new_titles]
+            )
+        return [title for title, _ in genre_links]
+
+
+class TitleBulkSerializer(serializers.Serializer):
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=256, required=False)
+    year = serializers.IntegerField(
+        min_value=0, max_value=32767, required=False)
+    # Тот же предел, что у TitleCreateSerializer, берётся из модели.
+    description = serializers.CharField(
+        max_length=Title._meta.get_field('description').max_length,
+        allow_blank=True, allow_null=True, required=False)
+    genre = serializers.ListField(
+        child=serializers.SlugField(), allow_empty=False, required=False)
+    category = serializers.SlugField(allow_null=True, required=False)
+
+    class Meta:
+        list_serializer_class = TitleBulkListSerializer
+
+    def validate(self, attrs):
+        if 'id' not in attrs:
+            missing = {
+                field: ['Обязательное поле.']
+                for field in ('name', 'year', 'genre')
+                if field not in attrs
+            }
+            if missing:
+                raise serializers.ValidationError(missing)
+        return attrs
+
+
+def histogram_requested(request):
+    """Гистограмму оценок отдаём только по запросу: ?include=histogram."""
+    return request is not None and 'histogram' in request.query_params.get(
+        'include', '').split(',')
 
 
 class TitleReadSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
     rating = serializers.IntegerField(read_only=True)
+    histogram = serializers.SerializerMethodField()
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = (
+            'id', 'category', 'genre', 'rating',
+            'name', 'year', 'description', 'histogram'
+        )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not histogram_requested(self.context.get('request')):
+            self.fields.pop('histogram')
+
+    def get_histogram(self, obj):
+        return build_histogram(
+            (score_count.score, score_count.count)
+            for score_count in obj.score_counts.all()
+        )
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    by = serializers.ChoiceField(choices=tuple(ORDERINGS), default='rating')
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+    min_reviews = serializers.IntegerField(min_value=1, default=1)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+    def validate(self, attrs):
+        if 'category' in attrs and 'genre' in attrs:
+            raise serializers.ValidationError(
+                'Укажите либо категорию, либо жанр.')
+        return attrs
+
+
+class TitleRankingSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='title_id')
+    name = serializers.CharField(source='title.name')
+
+    class Meta:
+        model = TitleRanking
+        fields = ('id', 'name', 'rating', 'review_count')
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -96,20 +306,26 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = (
+            'id', 'text', 'author', 'score', 'pub_date', 'comment_count')
         model = Review
 
-    def validate(self, data):
-        request = self.context['request']
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        author = request.user
-        if request.method == 'POST':
-            if title.review.filter(author=author).exists():
-                raise serializers.ValidationError(
-                    'Вы уже оставляли отзыв на данный контент!'
-                )
-        return data
+    def create(self, validated_data):
+        # Повторный отзыв отсекает ограничение unique_title_author, а не
+        # предварительная проверка: она лишний запрос и не спасает от гонки.
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author=validated_data['author']
+            ).exists():
+                raise
+        raise serializers.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                'Вы уже оставляли отзыв на данный контент!']
+        })
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -120,3 +336,57 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('id', 'text', 'author', 'pub_date')
         model = Comment
+
+
+class ReviewWithTitleSerializer(ReviewSerializer):
+    title = serializers.IntegerField(source='title_id', read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = (
+            'id', 'title', 'text', 'author', 'score', 'pub_date',
+            'comment_count'
+        )
+
+
+class CommentWithTitleSerializer(CommentSerializer):
+    # title_id — аннотация запроса: annotate(title_id=F('review__title_id')),
+    # сам отзыв при этом не загружается.
+    title = serializers.IntegerField(source='title_id', read_only=True)
+    review = serializers.IntegerField(source='review_id', read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = ('id', 'title', 'review', 'text', 'author', 'pub_date')
+
+
+class ChangeFeedQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+    model = serializers.ChoiceField(choices=MODEL_NAMES, required=False)
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Change
+        fields = ('seq', 'model', 'object_id', 'action', 'created_at')
+
+
+class ModerationSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=ACTIONS)
+    review_ids = serializers.ListField(
+        child=serializers.IntegerField(), max_length=1000, default=list)
+    comment_ids = serializers.ListField(
+        child=serializers.IntegerField(), max_length=1000, default=list)
+    author = serializers.SlugRelatedField(
+        queryset=User.objects.all(), slug_field='username', required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if not (attrs['review_ids'] or attrs['comment_ids']
+                or 'author' in attrs):
+            raise serializers.ValidationError(
+                'Укажите id отзывов или комментариев либо автора.')
+        if 'author' not in attrs and ('since' in attrs or 'until' in attrs):
+            raise serializers.ValidationError(
+                'Период можно указать только вместе с автором.')
+        return attrs
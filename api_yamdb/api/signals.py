@@ -0,0 +1,108 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import per_row, reviews_changed, titles_changed
+from . import cache
+
+
+def bump_titles(*title_ids):
+    # Версии сдвигаются после коммита, иначе параллельный запрос успеет
+    # закэшировать старые данные под новой версией.
+    transaction.on_commit(partial(cache.bump_titles, *title_ids))
+
+
+def bump_catalog():
+    transaction.on_commit(cache.bump_catalog)
+
+
+def bump_versions(*keys):
+    transaction.on_commit(partial(cache.bump_versions, *keys))
+
+
+def forget_auth_user(user):
+    # Роль и активность пользователя кэшируются для аутентификации.
+    transaction.on_commit(partial(cache.forget_user, user.pk))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    bump_titles(instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        bump_catalog()
+    else:
+        bump_titles(instance.pk)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@per_row
+def invalidate_review_title(sender, instance, **kwargs):
+    bump_titles(instance.title_id)
+    bump_versions(cache.reviews_version_key(instance.title_id))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@per_row
+def invalidate_review_comments(sender, instance, **kwargs):
+    # Список отзывов показывает число комментариев, поэтому сдвигается
+    # и его версия. Отзыв обычно уже загружен вьюсетом.
+    if sender.review.is_cached(instance):
+        title_id = instance.review.title_id
+    else:
+        title_id = Review.objects.filter(
+            pk=instance.review_id).values_list('title_id', flat=True).first()
+    bump_versions(
+        cache.comments_version_key(instance.review_id),
+        cache.reviews_version_key(title_id)
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_username(sender, instance, created, **kwargs):
+    # Имена авторов выводятся в отзывах и комментариях. У нового
+    # пользователя отзывов нет, а регистрация и правка профиля не должны
+    # сбрасывать ETag всех отзывов и комментариев.
+    if not created and instance._loaded_username != instance.username:
+        bump_versions(cache.USERS_VERSION_KEY)
+    instance._loaded_username = instance.username
+    forget_auth_user(instance)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    bump_versions(cache.USERS_VERSION_KEY)
+    forget_auth_user(instance)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog(sender, **kwargs):
+    bump_catalog()
+
+
+@receiver(titles_changed)
+def invalidate_changed_titles(sender, title_ids, **kwargs):
+    if title_ids is None:
+        bump_catalog()
+    else:
+        bump_titles(*title_ids)
+        bump_versions(*map(cache.reviews_version_key, title_ids))
+
+
+@receiver(reviews_changed)
+def invalidate_changed_reviews(sender, review_ids, **kwargs):
+    bump_versions(*map(cache.comments_version_key, review_ids))
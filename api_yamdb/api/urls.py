@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, SignUpApi, TitleViewSet, TokenAPI,
-                    UserViewSet)
+from .views import (CategoryViewSet, ChangeFeedView, CommentExportView,
+                    CommentViewSet, GenreViewSet, ModerationView,
+                    ReviewExportView, ReviewViewSet, SignUpApi, TitleViewSet,
+                    TokenAPI, UserViewSet)
 
 router = DefaultRouter()
 app_name = 'api'
@@ -24,6 +25,15 @@ auth_urls = [
     path('token/', TokenAPI.as_view(), name='get_token')
 ]
 
+export_urls = [
+    path('reviews/', ReviewExportView.as_view(), name='export_reviews'),
+    path('comments/', CommentExportView.as_view(), name='export_comments'),
+]
+
 urlpatterns = [path('v1/', include(router.urls)),
                path('v1/auth/', include(auth_urls)),
+               path('v1/export/', include(export_urls)),
+               path('v1/changes/', ChangeFeedView.as_view(), name='changes'),
+               path('v1/moderation/', ModerationView.as_view(),
+                    name='moderation'),
                ]
@@ -1,35 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
 from django.contrib.auth.tokens import default_token_generator
-from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from reviews.models import Category, Genre, Review, Title
-from .filters import FilterTitleSet
-from .mixins import CreateDeleteViewSet
+from reviews.aggregates import build_histogram
+from reviews.changes import changes_since
+from reviews.moderation import moderate
+from reviews.outbox import enqueue_email
+from reviews.models import (Category, Comment, Genre, Review, ScoreCount,
+                            Title)
+from reviews.rankings import (ALL_SCOPE, category_scope, genre_scope,
+                              leaderboard)
+from . import cache
+from .filters import (CommentExportFilterSet, FilterTitleSet,
+                      ReviewExportFilterSet)
+from .mixins import (AsyncReadMixin, CachedResponseMixin,
+                     ConditionalGetMixin, ConditionalListMixin,
+                     CreateDeleteViewSet)
+from .pagination import PageNumberOrCursorPagination, ViewCursorPagination
 from .permissions import (
     AuthorIsAuthenticatedModeratorAdminSuperuserOrReadOnly,
-    IsAdminOnlyPermission, IsAdminOrReadOnly)
-from .serializers import (CategorySerializer, CommentSerializer,
+    IsAdminOnlyPermission, IsAdminOrReadOnly, IsModeratorOrAdmin)
+from .renderers import FastJSONRenderer
+from .serializers import (CategorySerializer, ChangeFeedQuerySerializer,
+                          ChangeSerializer, CommentSerializer,
+                          CommentWithTitleSerializer,
                           CustomUserTokenSerializer, GenreSerializer,
+                          LeaderboardQuerySerializer, ModerationSerializer,
                           RegistrationSerializer, ReviewSerializer,
-                          TitleCreateSerializer, TitleReadSerializer,
-                          UserMeSerializer, UsersSerializer)
+                          ReviewWithTitleSerializer, TitleBulkSerializer,
+                          TitleCreateSerializer, TitleRankingSerializer,
+                          TitleReadSerializer, UserMeSerializer,
+                          UsersSerializer, histogram_requested)
 
 User = get_user_model()
 
 
 class TokenAPI(APIView):
 
-    """Отправляет и обновляет токен пользователю."""
+    """
+    Отправляет и обновляет токен пользователю.
+
+    Код подтверждения не хранится: check_token сверяет его подпись с уже
+    загруженной строкой пользователя и проверяет срок действия
+    (PASSWORD_RESET_TIMEOUT).
+    """
 
     def post(self, request):
         serializer = CustomUserTokenSerializer(data=request.data)
@@ -37,7 +67,7 @@ class TokenAPI(APIView):
         username = serializer.validated_data['username']
         confirmation_code = serializer.validated_data['confirmation_code']
         user = get_object_or_404(User, username=username)
-        if str(user.confirmation_code) == confirmation_code:
+        if default_token_generator.check_token(user, confirmation_code):
             refresh = RefreshToken.for_user(user)
             token = {'token': str(refresh.access_token)}
             return Response(token, status=status.HTTP_200_OK)
@@ -55,6 +85,8 @@ class UserViewSet(viewsets.ModelViewSet):
     lookup_field = 'username'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
+    # Порядок курсорной пагинации истории отзывов и комментариев.
+    cursor_ordering = ('-pub_date', 'id')
     http_method_names = ['get', 'post', 'patch', 'delete']
 
     @action(
@@ -75,6 +107,50 @@ class UserViewSet(viewsets.ModelViewSet):
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def get_author(self):
+        """Пользователь из адреса; me — текущий пользователь."""
+        if self.kwargs['username'] != 'me':
+            return get_object_or_404(User, username=self.kwargs['username'])
+        if not self.request.user.is_authenticated:
+            raise NotAuthenticated()
+        return self.request.user
+
+    def history(self, queryset, serializer_class):
+        page = self.paginate_queryset(queryset)
+        serializer = serializer_class(
+            page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        methods=['GET'],
+        detail=True,
+        permission_classes=(AllowAny,),
+        pagination_class=ViewCursorPagination)
+    def reviews(self, request, username=None):
+        """Отзывы пользователя, новые первыми."""
+        return self.history(
+            Review.objects.filter(
+                author=self.get_author(), is_hidden=False
+            ).select_related('author'),
+            ReviewWithTitleSerializer
+        )
+
+    @action(
+        methods=['GET'],
+        detail=True,
+        permission_classes=(AllowAny,),
+        pagination_class=ViewCursorPagination)
+    def comments(self, request, username=None):
+        """Комментарии пользователя, новые первыми."""
+        return self.history(
+            Comment.objects.filter(
+                author=self.get_author(), is_hidden=False,
+                review__is_hidden=False
+            ).select_related('author').annotate(
+                title_id=F('review__title_id')),
+            CommentWithTitleSerializer
+        )
+
 
 class SignUpApi(APIView):
 
@@ -82,25 +158,27 @@ class SignUpApi(APIView):
 
     def post(self, request):
         serializer = RegistrationSerializer(data=request.data)
-        user = User.objects.filter(username=request.data.get('username'),
-                                   email=request.data.get('email')).first()
-        if user:
-            serializer = RegistrationSerializer(user, data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        user = User.objects.get(username=request.data.get('username'))
-        confirmation_code = default_token_generator.make_token(user)
-        user.confirmation_code = confirmation_code
-        send_mail(
-            'Код подверждения для регистрации на платформе YaMDb',
-            confirmation_code,
-            settings.DEFAULT_EMAIL,
-            (serializer.validated_data['email'], ),
-            fail_silently=False)
+        try:
+            self.register(serializer)
+        except IntegrityError:
+            # Того же пользователя успела создать параллельная регистрация,
+            # повторная попытка найдёт его первым же запросом.
+            self.register(serializer)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def register(self, serializer):
+        # Письмо ставится в очередь в одной транзакции с пользователем и
+        # отправляется командой send_outbox, не задерживая ответ.
+        with transaction.atomic():
+            user = serializer.save()
+            enqueue_email(
+                'Код подверждения для регистрации на платформе YaMDb',
+                default_token_generator.make_token(user),
+                user.email)
+
 
-class GenreViewSet(CreateDeleteViewSet):
+class GenreViewSet(AsyncReadMixin, ConditionalListMixin, CreateDeleteViewSet):
     queryset = Genre.objects.all().order_by('id')
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -108,6 +186,9 @@ class GenreViewSet(CreateDeleteViewSet):
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
 
+    def get_version_keys(self):
+        return (cache.GLOBAL_VERSION_KEY,)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(
             data=request.data, context={'request': request})
@@ -119,7 +200,8 @@ class GenreViewSet(CreateDeleteViewSet):
                         headers=headers)
 
 
-class CategoryViewSet(CreateDeleteViewSet):
+class CategoryViewSet(AsyncReadMixin, ConditionalListMixin,
+                      CreateDeleteViewSet):
     queryset = Category.objects.all().order_by('id')
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -127,6 +209,9 @@ class CategoryViewSet(CreateDeleteViewSet):
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
 
+    def get_version_keys(self):
+        return (cache.GLOBAL_VERSION_KEY,)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -136,10 +221,9 @@ class CategoryViewSet(CreateDeleteViewSet):
             serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.order_by('id').annotate(
-        rating=Avg('review__score')
-    )
+class TitleViewSet(AsyncReadMixin, ConditionalGetMixin, CachedResponseMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.order_by('id')
     serializer_class = TitleCreateSerializer
     permission_classes = [IsAdminOrReadOnly, ]
     http_method_names = [
@@ -147,48 +231,271 @@ class TitleViewSet(viewsets.ModelViewSet):
     ]
     filter_backends = (DjangoFilterBackend,)
     filterset_class = FilterTitleSet
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('id',)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_serializer_class() is TitleReadSerializer:
+            queryset = queryset.select_related(
+                'category').prefetch_related('genre')
+            if histogram_requested(self.request):
+                queryset = queryset.prefetch_related('score_counts')
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return TitleCreateSerializer
         return TitleReadSerializer
 
+    def get_version_keys(self):
+        if self.detail:
+            return (
+                cache.GLOBAL_VERSION_KEY,
+                cache.title_version_key(self.kwargs['pk'])
+            )
+        return cache.GLOBAL_VERSION_KEY, cache.LIST_VERSION_KEY
+
+    def get_cache_key(self, request):
+        if self.detail:
+            return cache.title_detail_key(
+                request, self.kwargs['pk'], kind=self.action)
+        return cache.title_list_key(request)
+
+    @action(methods=['POST'], detail=False, url_path='bulk')
+    def bulk(self, request):
+        """Создаёт и обновляет (по id) произведения одним запросом."""
+        serializer = TitleBulkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        titles = serializer.save()
+        saved = self.get_queryset().in_bulk([title.pk for title in titles])
+        serializer = self.get_serializer(
+            [saved[title.pk] for title in titles], many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(methods=['GET'], detail=False, url_path='leaderboard')
+    def leaderboard(self, request):
+        """Лучшие или самые обсуждаемые произведения, общие или по области."""
+        query = LeaderboardQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        scope = ALL_SCOPE
+        if 'category' in params:
+            scope = category_scope(params['category'])
+        elif 'genre' in params:
+            scope = genre_scope(params['genre'])
+        entries = leaderboard(
+            scope, params['by'], params['min_reviews'], params['limit'])
+        return Response(TitleRankingSerializer(entries, many=True).data)
+
+    @action(methods=['GET'], detail=True, url_path='histogram')
+    def histogram(self, request, pk=None):
+        """Число отзывов с каждой оценкой без чтения самих отзывов."""
+        return self.conditional_response(request, lambda: (
+            cache.cached_response(
+                self.get_cache_key(request),
+                lambda: Response(build_histogram(
+                    ScoreCount.objects.filter(
+                        title=get_object_or_404(Title, pk=pk)
+                    ).values_list('score', 'count')
+                ))
+            )
+        ))
+
+
+class ReviewViewSet(AsyncReadMixin, ConditionalGetMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (
         AuthorIsAuthenticatedModeratorAdminSuperuserOrReadOnly,)
     http_method_names = [
         'get', 'post', 'patch', 'delete'
     ]
-
-    def get_title_id(self):
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('-pub_date', 'id')
+
+    def get_version_keys(self):
+        # Глобальная версия сдвигается и после массовой загрузки данных.
+        return (
+            cache.GLOBAL_VERSION_KEY,
+            cache.reviews_version_key(self.kwargs['title_id']),
+            cache.USERS_VERSION_KEY
+        )
+
+    @cached_property
+    def title(self):
+        """Произведение из адреса; загружается один раз за запрос."""
         return get_object_or_404(Title, id=self.kwargs.get('title_id'))
 
+    def check_parent(self):
+        self.title
+
     def get_queryset(self):
-        return self.get_title_id().review.all()
+        if self.detail:
+            # Отзыв ищется с фильтром по произведению, загружать само
+            # произведение не нужно.
+            return Review.objects.filter(
+                title_id=self.kwargs.get('title_id'), is_hidden=False
+            ).select_related('author')
+        return self.title.review.filter(
+            is_hidden=False).select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user,
-                        title=self.get_title_id())
+        serializer.save(author=self.request.user, title=self.title)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(AsyncReadMixin, ConditionalGetMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (
         AuthorIsAuthenticatedModeratorAdminSuperuserOrReadOnly,)
     http_method_names = [
         'get', 'post', 'patch', 'delete'
     ]
-
-    def get_review(self):
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('-pub_date', 'id')
+
+    def get_version_keys(self):
+        # Глобальная версия сдвигается и после массовой загрузки данных.
+        return (
+            cache.GLOBAL_VERSION_KEY,
+            cache.comments_version_key(self.kwargs['review_id']),
+            cache.USERS_VERSION_KEY
+        )
+
+    @cached_property
+    def review(self):
+        """
+        Отзыв из адреса; загружается один раз за запрос.
+
+        Фильтр по title_id одним запросом проверяет и существование
+        произведения, и то, что отзыв относится именно к нему.
+        """
         return get_object_or_404(Review,
                                  id=self.kwargs.get('review_id'),
-                                 title_id=self.kwargs.get('title_id'))
+                                 title_id=self.kwargs.get('title_id'),
+                                 is_hidden=False)
+
+    def check_parent(self):
+        self.review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        if self.detail:
+            return Comment.objects.filter(
+                review_id=self.kwargs.get('review_id'),
+                review__title_id=self.kwargs.get('title_id'),
+                review__is_hidden=False,
+                is_hidden=False
+            ).select_related('author')
+        return self.review.comments.filter(
+            is_hidden=False).select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user,
-                        review=self.get_review())
+        serializer.save(author=self.request.user, review=self.review)
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка в формате NDJSON: по объекту JSON на строку.
+
+    Строки читаются из базы пачками по chunk_size через iterator() и сразу
+    уходят клиенту, поэтому память не растёт с размером выгрузки.
+    """
+
+    permission_classes = (IsAuthenticated, IsAdminOnlyPermission)
+    chunk_size = 2000
+    queryset = None
+    filterset_class = None
+    serializer_class = None
+
+    def get(self, request):
+        filterset = self.filterset_class(
+            request.query_params, queryset=self.queryset.all())
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        serializer = self.serializer_class(context={'request': request})
+        return StreamingHttpResponse(
+            self.stream(filterset.qs, serializer),
+            content_type='application/x-ndjson')
+
+    def stream(self, queryset, serializer):
+        """
+        NDJSON пачками по chunk_size строк.
+
+        Все пачки читает и кодирует один рабочий поток: под ASGI Django 3.2
+        перебирает потоковый ответ в цикле событий, где обращаться к базе
+        нельзя. Курсор iterator() при этом остаётся в одном соединении.
+        """
+        renderer = FastJSONRenderer()
+        rows = queryset.iterator(chunk_size=self.chunk_size)
+
+        def render_chunk():
+            return b''.join(
+                renderer.render(serializer.to_representation(obj)) + b'\n'
+                for obj in islice(rows, self.chunk_size)
+            )
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            while True:
+                chunk = executor.submit(render_chunk).result()
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            executor.submit(connections.close_all).result()
+            executor.shutdown()
+
+
+class ReviewExportView(ExportView):
+    queryset = Review.objects.filter(is_hidden=False).select_related(
+        'author').order_by('pk')
+    filterset_class = ReviewExportFilterSet
+    serializer_class = ReviewWithTitleSerializer
+
+
+class CommentExportView(ExportView):
+    queryset = Comment.objects.filter(
+        is_hidden=False, review__is_hidden=False
+    ).select_related('author').annotate(
+        title_id=F('review__title_id')).order_by('pk')
+    filterset_class = CommentExportFilterSet
+    serializer_class = CommentWithTitleSerializer
+
+
+class ChangeFeedView(APIView):
+    """
+    Изменения произведений, отзывов, комментариев, жанров и категорий
+    после курсора ?since=. Ответ содержит курсор next для следующего
+    запроса; created и updated означают, что объект нужно перечитать.
+    """
+
+    permission_classes = (IsAuthenticated, IsAdminOnlyPermission)
+
+    def get(self, request):
+        params = ChangeFeedQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        since = params.validated_data['since']
+        entries, has_more = changes_since(
+            since, params.validated_data['limit'],
+            params.validated_data.get('model')
+        )
+        return Response({
+            'results': ChangeSerializer(entries, many=True).data,
+            'next': entries[-1]['seq'] if entries else since,
+            'has_more': has_more,
+        })
+
+
+class ModerationView(APIView):
+    """
+    Массовое удаление или скрытие отзывов и комментариев по списку id,
+    по автору или по автору за период.
+    """
+
+    permission_classes = (IsModeratorOrAdmin,)
+
+    def post(self, request):
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(moderate(**serializer.validated_data))
@@ -0,0 +1,128 @@
+"""
+Обслуживание соединений с базой данных и чтение с реплик.
+
+ReplicaRouter отправляет чтения на реплики (DATABASE_REPLICAS), а запись
+на основную базу. Чтение с реплик включает ReplicaMiddleware, и только
+для безопасных запросов: вне HTTP-запросов (команды, shell) и после
+первой записи в запросе все чтения идут на основную базу. Клиент, который
+только что писал, ещё REPLICA_STICKY_SECONDS читает с основной базы,
+чтобы сразу увидеть свой отзыв, несмотря на отставание реплики.
+"""
+import asyncio
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+STICKY_KEY = 'replica:sticky:{}'
+
+# Читать ли с основной базы. Вне ReplicaMiddleware — всегда.
+_use_primary = ContextVar('use_primary', default=True)
+_wrote = ContextVar('wrote', default=False)
+
+
+def check_connections(**kwargs):
+    """
+    Закрывает сохранённые соединения, которые перестали отвечать.
+
+    Django 3.2 переиспользует соединение при CONN_MAX_AGE > 0, но не
+    проверяет его: если база или пул закрыли соединение, первый запрос
+    после этого падает. Вызывается в начале каждого запроса, Django затем
+    открывает новое соединение. Так же ведёт себя CONN_HEALTH_CHECKS в
+    Django 4.1+.
+    """
+    for connection in connections.all():
+        if (
+            connection.connection is not None
+            and connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            and not connection.is_usable()
+        ):
+            connection.close()
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or _use_primary.get():
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        # Дальнейшие чтения в этом запросе должны видеть запись.
+        _use_primary.set(True)
+        _wrote.set(True)
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def sticky_key(request):
+    """Ключ клиента: JWT из заголовка, у анонима своих записей нет."""
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    return STICKY_KEY.format(
+        hashlib.md5(authorization.encode()).hexdigest())
+
+
+class ReplicaMiddleware:
+    """Включает чтение с реплик на время безопасного запроса."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django 3.2 узнаёт асинхронный middleware, как в
+            # MiddlewareMixin: иначе под ASGI вся цепочка уйдёт в поток.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        key, tokens = self.start(request)
+        try:
+            response = self.get_response(request)
+            self.finish(key)
+        finally:
+            self.reset(tokens)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        key, tokens = self.start(request)
+        try:
+            response = await self.get_response(request)
+            self.finish(key)
+        finally:
+            self.reset(tokens)
+        return response
+
+    def start(self, request):
+        key = sticky_key(request)
+        use_primary = (
+            request.method not in SAFE_METHODS
+            or key is not None and cache.get(key) is not None
+        )
+        return key, (_use_primary.set(use_primary), _wrote.set(False))
+
+    def finish(self, key):
+        if _wrote.get() and key is not None:
+            cache.set(key, 1, settings.REPLICA_STICKY_SECONDS)
+
+    def reset(self, tokens):
+        primary_token, wrote_token = tokens
+        _use_primary.reset(primary_token)
+        _wrote.reset(wrote_token)
@@ -26,6 +26,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api_yamdb.db.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,22 +61,92 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny', ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': (
         'rest_framework.pagination.PageNumberPagination'
     ),
     'PAGE_SIZE': 5,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 
+# База данных задаётся окружением: по умолчанию SQLite, для PostgreSQL
+# DB_ENGINE=django.db.backends.postgresql и параметры подключения,
+# для SQLite под конкурентной нагрузкой — api_yamdb.sqlite_tuned.
+DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.sqlite3')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': DB_ENGINE,
+        'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'USER': os.getenv('DB_USER', ''),
+        'PASSWORD': os.getenv('DB_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', ''),
+        'PORT': os.getenv('DB_PORT', ''),
+        # Сколько секунд соединение живёт между запросами; 0 — новое
+        # соединение на каждый запрос.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        # Проверять сохранённое соединение в начале запроса
+        # (см. api_yamdb/db.py).
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', '1') == '1',
+        # За PgBouncer в режиме transaction серверные курсоры не работают.
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', '0') == '1'),
+    }
+}
+
+if 'sqlite' in DB_ENGINE:
+    # Тестовая база в файле: общая база в памяти не ждёт снятия
+    # блокировок, и параллельные запросы в тестах падают.
+    DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
+
+# Реплики для чтения: DB_REPLICAS — через запятую хосты реплик, а для
+# SQLite пути к файлам. Остальные параметры берутся из основной базы.
+# В тестах реплики смотрят в основную базу.
+for number, location in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'NAME' if 'sqlite' in DB_ENGINE else 'HOST': location.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['api_yamdb.db.ReplicaRouter']
+
+# Сколько секунд клиент после своей записи читает с основной базы.
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
+TITLES_CACHE_TIMEOUT = int(os.getenv('TITLES_CACHE_TIMEOUT', 300))
+
+# Сколько секунд живёт счётчик версии; истёкший заводится заново, как
+# после изменения данных.
+CACHE_VERSION_TIMEOUT = int(os.getenv('CACHE_VERSION_TIMEOUT', 60 * 60 * 24))
+
+# Чтения через пул потоков под ASGI; включается в asgi.py.
+ASYNC_READS = os.getenv('ASYNC_READS', '0') == '1'
+
+# Сколько секунд аутентификация по JWT берёт пользователя из кэша.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -155,3 +226,14 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 DEFAULT_EMAIL = 'YaMDb@admin.com'
+
+# Срок действия кода подтверждения в секундах. Код подписывается
+# default_token_generator и в базе не хранится.
+PASSWORD_RESET_TIMEOUT = int(
+    os.getenv('CONFIRMATION_CODE_TIMEOUT', 60 * 60 * 24))
+
+# Очередь писем: размер пачки, число попыток и начальная задержка
+# повтора в секундах (дальше она удваивается).
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 100))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+OUTBOX_RETRY_DELAY = int(os.getenv('OUTBOX_RETRY_DELAY', 60))
@@ -0,0 +1,79 @@
+"""
+SQLite для конкурентной нагрузки: DB_ENGINE=api_yamdb.sqlite_tuned.
+
+Отличия от django.db.backends.sqlite3:
+
+- каждое новое соединение включает WAL (читатели не ждут писателя),
+  synchronous=NORMAL, кэш страниц, mmap и busy_timeout — см. PRAGMAS,
+  значения можно переопределить ключом PRAGMAS в настройках базы;
+- транзакция начинается с BEGIN IMMEDIATE: блокировка на запись берётся
+  сразу, и busy_timeout ждёт её освобождения. С обычным BEGIN транзакция,
+  которая сначала читает, а потом пишет, получает «database is locked»
+  без ожидания;
+- запрос вне транзакции (в том числе сам BEGIN IMMEDIATE), упавший с
+  «database is locked», повторяется до LOCK_RETRIES раз с растущей
+  паузой. Внутри транзакции повтор невозможен: её откатывают целиком.
+"""
+import time
+
+from django.db.backends.sqlite3 import base as sqlite3_base
+
+Database = sqlite3_base.Database
+
+PRAGMAS = {
+    # Первым, чтобы остальные PRAGMA тоже ждали блокировку.
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Отрицательное значение — размер в КиБ, здесь 64 МиБ.
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+LOCK_RETRIES = 5
+LOCK_RETRY_DELAY = 0.05
+
+
+def is_locked(error):
+    return 'database is locked' in str(error)
+
+
+class RetryingCursorWrapper(sqlite3_base.SQLiteCursorWrapper):
+    lock_retries = LOCK_RETRIES
+
+    def execute(self, query, params=None):
+        return self._retry(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        return self._retry(super().executemany, query, param_list)
+
+    def _retry(self, method, *args):
+        for attempt in range(self.lock_retries + 1):
+            try:
+                return method(*args)
+            except Database.OperationalError as error:
+                if (
+                    not is_locked(error)
+                    or self.connection.in_transaction
+                    or attempt == self.lock_retries
+                ):
+                    raise
+            time.sleep(LOCK_RETRY_DELAY * 2 ** attempt)
+
+
+class DatabaseWrapper(sqlite3_base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragmas = {**PRAGMAS, **self.settings_dict.get('PRAGMAS', {})}
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=RetryingCursorWrapper)
+        cursor.lock_retries = self.settings_dict.get(
+            'LOCK_RETRIES', LOCK_RETRIES)
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,160 @@
+"""Денормализованные агрегаты оценок произведений."""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, ExpressionWrapper, F, IntegerField, Sum
+from django.db.models.functions import NullIf
+
+from .models import Comment, Review, ScoreCount, Title
+from .validators import MAX_SCORE, MIN_SCORE
+
+
+def rating_expression(score_sum, review_count):
+    """Целочисленный рейтинг: сумма оценок, делённая на число отзывов."""
+    return ExpressionWrapper(
+        score_sum / NullIf(review_count, 0),
+        output_field=IntegerField()
+    )
+
+
+def calculate_rating(score_sum, review_count):
+    if not review_count:
+        return None
+    return score_sum // review_count
+
+
+def apply_review_delta(title_id, score_delta, count_delta):
+    """Сдвигает агрегаты произведения одним UPDATE без чтения строки."""
+    score_sum = F('score_sum') + score_delta
+    review_count = F('review_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        score_sum=score_sum,
+        review_count=review_count,
+        rating=rating_expression(score_sum, review_count)
+    )
+
+
+def apply_score_count_delta(title_id, score, delta):
+    """Сдвигает столбец гистограммы, создавая его при первой оценке."""
+    counts = ScoreCount.objects.filter(title_id=title_id, score=score)
+    if counts.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            ScoreCount.objects.create(
+                title_id=title_id, score=score, count=delta)
+    except IntegrityError:
+        # Столбец успел создать параллельный запрос.
+        counts.update(count=F('count') + delta)
+
+
+def apply_comment_delta(review_id, delta):
+    """Сдвигает счётчик комментариев отзыва одним UPDATE."""
+    Review.objects.filter(pk=review_id).update(
+        comment_count=F('comment_count') + delta)
+
+
+def build_histogram(score_counts):
+    """Гистограмма по всем допустимым оценкам, включая нулевые."""
+    histogram = dict.fromkeys(map(str, range(MIN_SCORE, MAX_SCORE + 1)), 0)
+    for score, count in score_counts:
+        histogram[str(score)] = count
+    return histogram
+
+
+def recompute_title_aggregates(title_ids, commit=True):
+    """
+    Пересчитывает агрегаты переданных произведений по таблице отзывов.
+
+    Возвращает список кортежей (id, сохранённые, актуальные) для
+    произведений, агрегаты которых разошлись с отзывами.
+    """
+    drift = []
+    with transaction.atomic():
+        titles = Title.objects.filter(pk__in=title_ids).select_for_update()
+        totals = {
+            row['title_id']: (row['total'], row['count'])
+            for row in Review.objects.filter(
+                title_id__in=title_ids, is_hidden=False
+            ).values('title_id').annotate(
+                total=Sum('score'), count=Count('id')
+            ).order_by()
+        }
+        changed = []
+        for title in titles.only('score_sum', 'review_count', 'rating'):
+            score_sum, review_count = totals.get(title.pk, (0, 0))
+            expected = (
+                score_sum, review_count,
+                calculate_rating(score_sum, review_count)
+            )
+            stored = (title.score_sum, title.review_count, title.rating)
+            if stored == expected:
+                continue
+            drift.append((title.pk, stored, expected))
+            title.score_sum, title.review_count, title.rating = expected
+            changed.append(title)
+        if commit and changed:
+            Title.objects.bulk_update(
+                changed, ('score_sum', 'review_count', 'rating')
+            )
+    return drift
+
+
+def recompute_score_histograms(title_ids, commit=True):
+    """
+    Пересобирает гистограммы переданных произведений по таблице отзывов.
+
+    Возвращает id произведений, гистограммы которых разошлись с отзывами.
+    """
+    with transaction.atomic():
+        stored = set(
+            ScoreCount.objects.filter(
+                title_id__in=title_ids, count__gt=0
+            ).values_list('title_id', 'score', 'count')
+        )
+        expected = set(
+            Review.objects.filter(
+                title_id__in=title_ids, is_hidden=False
+            ).values('title_id', 'score').annotate(
+                count=Count('id')
+            ).order_by().values_list(
+                'title_id', 'score', 'count'
+            )
+        )
+        drift = sorted({row[0] for row in stored ^ expected})
+        if commit and drift:
+            ScoreCount.objects.filter(title_id__in=drift).delete()
+            ScoreCount.objects.bulk_create(
+                ScoreCount(title_id=title_id, score=score, count=count)
+                for title_id, score, count in expected if title_id in drift
+            )
+    return drift
+
+
+def recompute_comment_counts(title_ids, commit=True):
+    """
+    Пересчитывает счётчики комментариев отзывов переданных произведений.
+
+    Возвращает список кортежей (id произведения, id отзыва, сохранённое,
+    актуальное) для разошедшихся счётчиков.
+    """
+    drift = []
+    with transaction.atomic():
+        reviews = Review.objects.filter(
+            title_id__in=title_ids).select_for_update()
+        counts = dict(
+            Comment.objects.filter(
+                review__title_id__in=title_ids, is_hidden=False
+            ).values('review_id').annotate(count=Count('id'))
+            .order_by().values_list('review_id', 'count')
+        )
+        changed = []
+        for review in reviews.only('title_id', 'comment_count'):
+            expected = counts.get(review.pk, 0)
+            if review.comment_count == expected:
+                continue
+            drift.append(
+                (review.title_id, review.pk, review.comment_count, expected))
+            review.comment_count = expected
+            changed.append(review)
+        if commit and changed:
+            Review.objects.bulk_update(changed, ('comment_count',))
+    return drift
@@ -0,0 +1,80 @@
+"""Журнал изменений: что записывать и как читать его с курсора."""
+from django.db import connections, router, transaction
+from django.db.models import BigIntegerField, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from .models import Category, Change, Comment, Genre, Review, Title
+
+TRACKED_MODELS = {
+    Title: 'title',
+    Review: 'review',
+    Comment: 'comment',
+    Genre: 'genre',
+    Category: 'category',
+}
+MODEL_NAMES = tuple(TRACKED_MODELS.values())
+# Следующий ещё не выданный номер транзакции и самый старый из
+# незавершённых в снимке текущего запроса PostgreSQL.
+SNAPSHOT_XMAX = 'txid_snapshot_xmax(txid_current_snapshot())'
+SNAPSHOT_XMIN = 'txid_snapshot_xmin(txid_current_snapshot())'
+MAX_SEQ = 2 ** 63 - 1
+
+
+def log_changes(model, object_ids, action):
+    """
+    Дописывает в журнал по записи на каждый объект.
+
+    seq выдаётся при вставке, а не при коммите, поэтому в PostgreSQL
+    запись N+1 может закоммититься раньше N. Чтобы клиент не сдвинул
+    курсор мимо N, запись получает horizon — номер, который PostgreSQL
+    выдаст следующей транзакции, после того как seq уже выдан. Все
+    транзакции, успевшие взять seq меньше, имеют номер меньше horizon,
+    и changes_since не отдаёт запись, пока хоть одна из них не
+    завершилась. SQLite пишет по одной транзакции, horizon там не нужен.
+    """
+    changes = [
+        Change(model=TRACKED_MODELS[model], object_id=object_id,
+               action=action)
+        for object_id in object_ids
+    ]
+    if not changes:
+        return
+    using = router.db_for_write(Change)
+    if connections[using].vendor != 'postgresql':
+        Change.objects.using(using).bulk_create(changes)
+        return
+    with transaction.atomic(using=using, savepoint=False):
+        with connections[using].cursor() as cursor:
+            # Номер транзакции должен быть выдан до seq.
+            cursor.execute('SELECT txid_current()')
+        Change.objects.using(using).bulk_create(changes)
+        Change.objects.using(using).filter(
+            seq__in=[change.seq for change in changes]
+        ).update(horizon=RawSQL(SNAPSHOT_XMAX, []))
+
+
+def changes_since(seq, limit, model=None):
+    """
+    Записи журнала после курсора seq по возрастанию, не больше limit.
+
+    Возвращает записи и признак того, что за ними есть ещё. В PostgreSQL
+    выдача обрывается перед первой записью, которую могли обогнать ещё
+    не закоммиченные транзакции (см. log_changes); она появится в
+    следующем запросе.
+    """
+    changes = Change.objects.filter(seq__gt=seq)
+    if model is not None:
+        changes = changes.filter(model=model)
+    if connections[router.db_for_read(Change)].vendor == 'postgresql':
+        unsafe = changes.filter(
+            horizon__gt=RawSQL(SNAPSHOT_XMIN, [])
+        ).order_by('seq').values('seq')[:1]
+        changes = changes.filter(seq__lt=Coalesce(
+            Subquery(unsafe), Value(MAX_SEQ),
+            output_field=BigIntegerField()
+        ))
+    entries = list(changes.order_by('seq').values(
+        'seq', 'model', 'object_id', 'action', 'created_at'
+    )[:limit + 1])
+    return entries[:limit], len(entries) > limit
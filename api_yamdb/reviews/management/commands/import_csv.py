@@ -0,0 +1,132 @@
+import csv
+import time
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from reviews.changes import TRACKED_MODELS, log_changes
+from reviews.models import (Category, Change, Comment, Genre, Review, Title,
+                            User)
+from reviews.signals import titles_changed
+
+# Порядок важен: каждая таблица ссылается только на уже загруженные.
+IMPORT_ORDER = (
+    ('users.csv', User, {}),
+    ('category.csv', Category, {}),
+    ('genre.csv', Genre, {}),
+    ('titles.csv', Title, {'category': 'category_id'}),
+    ('genre_title.csv', Title.genre.through, {}),
+    ('review.csv', Review, {'author': 'author_id'}),
+    ('comments.csv', Comment, {'author': 'author_id'}),
+)
+
+
+@contextmanager
+def explicit_pub_dates(*models):
+    """Отключает auto_now_add, чтобы сохранить pub_date из файла."""
+    fields = [model._meta.get_field('pub_date') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает данные из CSV-файлов static/data в базу пакетами '
+        'bulk_create, сохраняя id и даты публикации.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', type=Path,
+            default=Path(settings.BASE_DIR) / 'static' / 'data',
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько строк вставлять одной транзакцией.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать строки, которые уже есть в базе.'
+        )
+
+    def handle(self, *args, path, batch_size, ignore_conflicts, **options):
+        if not path.is_dir():
+            raise CommandError(f'Каталог {path} не найден.')
+        with explicit_pub_dates(Review, Comment):
+            for filename, model, renames in IMPORT_ORDER:
+                file_path = path / filename
+                if not file_path.exists():
+                    self.stdout.write(self.style.WARNING(
+                        f'{filename}: файл не найден, пропускаю'))
+                    continue
+                started = time.monotonic()
+                count = self.import_file(
+                    file_path, model, renames, batch_size, ignore_conflicts)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{filename}: {count} строк за {elapsed:.2f} с '
+                    f'({count / elapsed if elapsed else 0:.0f} строк/с)'
+                )
+        self.reset_sequences()
+        call_command('recompute_ratings', verbosity=0, stdout=self.stdout)
+        titles_changed.send(sender=Title, title_ids=None)
+
+    def import_file(self, file_path, model, renames, batch_size,
+                    ignore_conflicts):
+        count = 0
+        with open(file_path, encoding='utf-8', newline='') as csv_file:
+            objects = (
+                self.build_object(model, renames, row)
+                for row in csv.DictReader(csv_file)
+            )
+            while True:
+                batch = list(islice(objects, batch_size))
+                if not batch:
+                    return count
+                with transaction.atomic():
+                    model.objects.bulk_create(
+                        batch, ignore_conflicts=ignore_conflicts)
+                    self.log_batch(model, batch)
+                count += len(batch)
+
+    def log_batch(self, model, batch):
+        """bulk_create обходит сигналы, поэтому журнал пишется здесь."""
+        if model is Title.genre.through:
+            log_changes(
+                Title, {link.title_id for link in batch},
+                Change.Actions.UPDATED
+            )
+        elif model in TRACKED_MODELS:
+            log_changes(
+                model, [obj.pk for obj in batch], Change.Actions.CREATED)
+
+    def build_object(self, model, renames, row):
+        values = {}
+        for column, value in row.items():
+            attname = renames.get(column, column)
+            field = model._meta.get_field(attname)
+            if value == '' and field.null:
+                value = None
+            values[attname] = field.to_python(value)
+        instance = model(**values)
+        if model is User:
+            instance.set_unusable_password()
+        return instance
+
+    def reset_sequences(self):
+        models = [model for _, model, _ in IMPORT_ORDER]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.rankings import rebuild_all_rankings
+
+
+class Command(BaseCommand):
+    help = (
+        'Полностью пересобирает материализованный рейтинг произведений. '
+        'Подходит для запуска по расписанию.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Сколько произведений обрабатывать за один проход.'
+        )
+
+    def handle(self, *args, chunk_size, **options):
+        started = time.monotonic()
+        created = rebuild_all_rankings(chunk_size=chunk_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Строк рейтинга: {created}, '
+            f'за {time.monotonic() - started:.2f} с.'
+        ))
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+
+from reviews.aggregates import (recompute_comment_counts,
+                                recompute_score_histograms,
+                                recompute_title_aggregates)
+from reviews.models import Title
+from reviews.signals import titles_changed
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сумму оценок, число отзывов, рейтинг и гистограмму '
+        'оценок произведений, а также число комментариев к отзывам, и '
+        'сообщает о найденных расхождениях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Сколько произведений пересчитывать за одну транзакцию.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только сообщить о расхождениях, ничего не сохраняя.'
+        )
+
+    def handle(self, *args, chunk_size, dry_run, verbosity, **options):
+        checked = drifted = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Title.objects.filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            checked += len(ids)
+            drifted += self.repair_chunk(ids, dry_run, verbosity)
+        action = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено произведений: {checked}. '
+            f'{action} расхождений: {drifted}.'
+        ))
+
+    def repair_chunk(self, ids, dry_run, verbosity):
+        drift = recompute_title_aggregates(ids, commit=not dry_run)
+        histogram_drift = recompute_score_histograms(
+            ids, commit=not dry_run)
+        comment_drift = recompute_comment_counts(ids, commit=not dry_run)
+        changed = {row[0] for row in drift + comment_drift}.union(
+            histogram_drift)
+        if changed and not dry_run:
+            titles_changed.send(sender=Title, title_ids=sorted(changed))
+        if verbosity >= 1:
+            for title_id, stored, expected in drift:
+                self.stdout.write(self.style.WARNING(
+                    f'Произведение {title_id}: сохранено {stored}, '
+                    f'по отзывам {expected}'
+                ))
+            for title_id in histogram_drift:
+                self.stdout.write(self.style.WARNING(
+                    f'Произведение {title_id}: гистограмма оценок '
+                    'разошлась с отзывами'
+                ))
+            for title_id, review_id, stored, expected in comment_drift:
+                self.stdout.write(self.style.WARNING(
+                    f'Отзыв {review_id} на произведение {title_id}: '
+                    f'сохранено комментариев {stored}, по базе {expected}'
+                ))
+        return len(changed)
@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками, по одному соединению с '
+        'почтовым сервером на пачку. С --loop работает как постоянный '
+        'обработчик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE,
+            help='Сколько писем отправлять через одно соединение.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза между проверками очереди в режиме --loop.'
+        )
+
+    def handle(self, *args, batch_size, loop, interval, verbosity,
+               **options):
+        while True:
+            sent, failed = deliver_pending(batch_size)
+            if verbosity >= 1 and (sent or failed or not loop):
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, отложено до повтора: {failed}.'
+                )
+            if not loop:
+                return
+            time.sleep(interval)
@@ -0,0 +1,61 @@
+# Generated by Django 3.2 on 2026-10-18 17:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_rankings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    entries = []
+    titles = Title.objects.filter(review_count__gt=0).select_related(
+        'category').prefetch_related('genre')
+    for title in titles:
+        scopes = ['all'] + [f'genre:{genre.slug}' for genre in title.genre.all()]
+        if title.category is not None:
+            scopes.append(f'category:{title.category.slug}')
+        entries.extend(
+            TitleRanking(
+                scope=scope, title=title, rating=title.rating,
+                review_count=title.review_count
+            )
+            for scope in scopes
+        )
+    TitleRanking.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_score_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=64, verbose_name='Область')),
+                ('rating', models.PositiveSmallIntegerField(verbose_name='Рейтинг')),
+                ('review_count', models.PositiveIntegerField(verbose_name='Количество отзывов')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Позиция в рейтинге',
+                'verbose_name_plural': 'Позиции в рейтинге',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['scope', '-rating', '-review_count', 'title'], name='ranking_top_rated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['scope', '-review_count', '-rating', 'title'], name='ranking_most_reviewed_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titleranking',
+            constraint=models.UniqueConstraint(fields=('scope', 'title'), name='unique_scope_title'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_remove_user_confirmation_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='change',
+            name='horizon',
+            field=models.BigIntegerField(editable=False, null=True, verbose_name='Граница транзакций'),
+        ),
+    ]
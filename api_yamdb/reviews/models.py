@@ -1,11 +1,51 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from .validators import min_score_validator, max_score_validator
 
 
-class Base(models.Model):
+class AtomicSaveMixin:
+    """
+    Сохраняет объект в транзакции: обработчики post_save (агрегаты,
+    журнал изменений) пишут в ту же транзакцию, что и сама модель.
+    Удаление и так выполняется в транзакции вместе с сигналами.
+    """
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class CounterFieldsMixin:
+    """
+    Не перезаписывает счётчики и флаг модерации (counter_fields) при
+    сохранении существующего объекта.
+
+    Счётчики меняют только сигналы, UPDATE с F-выражениями, флаг
+    is_hidden — массовая модерация. Обычный save() записал бы их в том
+    виде, в каком объект прочитан, и изменение, сделанное между чтением и
+    save(), потерялось бы.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            not args and not self._state.adding
+            and not kwargs.get('force_insert')
+            and kwargs.get('update_fields') is None
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class Base(AtomicSaveMixin, models.Model):
     name = models.CharField(verbose_name='Название', max_length=256)
     slug = models.SlugField(verbose_name='Слаг', unique=True, max_length=50)
 
@@ -36,12 +76,6 @@ class User(AbstractUser):
         choices=Roles.choices,
         default=Roles.USER
     )
-    confirmation_code = models.CharField(
-        verbose_name='код подтверждения',
-        max_length=255,
-        null=True,
-        default='XXXX'
-    )
 
     class Meta:
         ordering = ('username',)
@@ -59,6 +93,16 @@ class User(AbstractUser):
             or self.is_superuser
         )
 
+    # Имя, загруженное из базы: по нему сигналы узнают, сменилось ли оно.
+    _loaded_username = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'username' in field_names:
+            instance._loaded_username = instance.username
+        return instance
+
 
 class Genre(Base):
 
@@ -82,7 +126,7 @@ class Category(Base):
         return self.name
 
 
-class Title(models.Model):
+class Title(CounterFieldsMixin, AtomicSaveMixin, models.Model):
     name = models.CharField('Название', max_length=256)
     year = models.PositiveSmallIntegerField(
         verbose_name='Год выхода',
@@ -102,6 +146,25 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         related_name='titles'
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False
+    )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name='Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
+
+    counter_fields = ('score_sum', 'review_count', 'rating')
 
     class Meta:
         ordering = ['name']
@@ -112,7 +175,7 @@ class Title(models.Model):
         return self.name
 
 
-class Review(models.Model):
+class Review(CounterFieldsMixin, AtomicSaveMixin, models.Model):
     title = models.ForeignKey(
         Title, verbose_name='Произведение',
         on_delete=models.CASCADE,
@@ -131,11 +194,27 @@ class Review(models.Model):
     )
     pub_date = models.DateTimeField(
         'Дата добавления отзыва', auto_now_add=True, db_index=True)
+    comment_count = models.PositiveIntegerField(
+        'Число комментариев', default=0, editable=False)
+    is_hidden = models.BooleanField(
+        'Скрыт модератором', default=False, editable=False)
+
+    counter_fields = ('comment_count', 'is_hidden')
 
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', 'id'],
+                name='review_author_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
@@ -147,8 +226,83 @@ class Review(models.Model):
         """Модель отзывов"""
         return self.text
 
+    # Оценка, загруженная из базы: по ней сигналы считают изменение суммы.
+    # Оценка и видимость в базе перед сохранением, их под блокировкой
+    # строки читает обработчик pre_save.
+    _loaded_score = None
+    _loaded_hidden = None
+
+
+class ScoreCount(models.Model):
+    """Число отзывов с данной оценкой: столбец гистограммы произведения."""
+    title = models.ForeignKey(
+        Title, verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        related_name='score_counts'
+    )
+    score = models.PositiveSmallIntegerField(
+        verbose_name='Оценка',
+        validators=[min_score_validator, max_score_validator]
+    )
+    count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов', default=0)
+
+    class Meta:
+        verbose_name = 'Гистограмма оценок'
+        verbose_name_plural = 'Гистограммы оценок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_title_score'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} — {self.count}'
+
+
+class TitleRanking(models.Model):
+    """
+    Материализованный рейтинг произведений.
+
+    Строка на каждую область рейтинга произведения: общий ('all'),
+    категория ('category:<slug>') и каждый жанр ('genre:<slug>').
+    """
+    scope = models.CharField(verbose_name='Область', max_length=64)
+    title = models.ForeignKey(
+        Title, verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        related_name='rankings'
+    )
+    rating = models.PositiveSmallIntegerField(verbose_name='Рейтинг')
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов')
+
+    class Meta:
+        verbose_name = 'Позиция в рейтинге'
+        verbose_name_plural = 'Позиции в рейтинге'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'title'],
+                name='unique_scope_title'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['scope', '-rating', '-review_count', 'title'],
+                name='ranking_top_rated_idx'
+            ),
+            models.Index(
+                fields=['scope', '-review_count', '-rating', 'title'],
+                name='ranking_most_reviewed_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.scope}: {self.title_id}'
+
 
-class Comment(models.Model):
+class Comment(CounterFieldsMixin, AtomicSaveMixin, models.Model):
     author = models.ForeignKey(
         User, verbose_name='Автор комментария',
         on_delete=models.CASCADE,
@@ -160,12 +314,91 @@ class Comment(models.Model):
     text = models.TextField(verbose_name='Текст комментария')
     pub_date = models.DateTimeField(
         'Дата добавления', auto_now_add=True, db_index=True)
+    is_hidden = models.BooleanField(
+        'Скрыт модератором', default=False, editable=False)
+
+    counter_fields = ('is_hidden',)
 
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', 'id'],
+                name='comment_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         """Модель комментариев"""
         return self.text
+
+
+class Change(models.Model):
+    """
+    Запись журнала изменений для синхронизации внешних систем.
+
+    Журнал только дополняется; seq растёт монотонно и служит курсором.
+    """
+
+    class Actions(models.TextChoices):
+        CREATED = 'created', _('Создан')
+        UPDATED = 'updated', _('Изменён')
+        DELETED = 'deleted', _('Удалён')
+
+    seq = models.BigAutoField(primary_key=True)
+    model = models.CharField('Модель', max_length=16)
+    object_id = models.BigIntegerField('id объекта')
+    action = models.CharField(
+        'Действие', max_length=7, choices=Actions.choices)
+    created_at = models.DateTimeField('Время изменения', auto_now_add=True)
+    horizon = models.BigIntegerField(
+        'Граница транзакций', null=True, editable=False)
+
+    class Meta:
+        ordering = ('seq',)
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+        indexes = [
+            models.Index(fields=['model', 'seq'], name='change_model_seq_idx')
+        ]
+
+    def __str__(self):
+        return f'{self.seq}: {self.model} {self.object_id} {self.action}'
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в очереди на отправку. Записывается в транзакции вызывающего
+    кода, доставляется командой send_outbox.
+    """
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipient = models.EmailField('Получатель', max_length=254)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(sent_at__isnull=True),
+                name='outbox_pending_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,81 @@
+"""Массовая модерация отзывов и комментариев."""
+from django.db import transaction
+from django.db.models import Q
+
+from .aggregates import (recompute_comment_counts, recompute_score_histograms,
+                         recompute_title_aggregates)
+from .changes import log_changes
+from .models import Change, Comment, Review, Title
+from .signals import bulk_operation, reviews_changed, titles_changed
+
+DELETE = 'delete'
+HIDE = 'hide'
+ACTIONS = (DELETE, HIDE)
+
+
+def _selection(review_ids, comment_ids, author, since, until):
+    """Условия отбора: перечисленные id или записи автора за период."""
+    reviews, comments = Q(pk__in=review_ids), Q(pk__in=comment_ids)
+    if author is not None:
+        by_author = Q(author=author)
+        if since is not None:
+            by_author &= Q(pub_date__gte=since)
+        if until is not None:
+            by_author &= Q(pub_date__lt=until)
+        reviews |= by_author
+        comments |= by_author
+    return reviews, comments
+
+
+def moderate(action, review_ids=(), comment_ids=(), author=None,
+             since=None, until=None):
+    """
+    Удаляет или скрывает отзывы и комментарии одной операцией.
+
+    Построчные обработчики отключены: агрегаты пересчитываются один раз
+    на каждое затронутое произведение. Возвращает число обработанных
+    отзывов и комментариев и число затронутых произведений.
+    """
+    review_filter, comment_filter = _selection(
+        review_ids, comment_ids, author, since, until)
+    with transaction.atomic(), bulk_operation():
+        reviews = Review.objects.filter(review_filter, is_hidden=False)
+        comments = Comment.objects.filter(
+            comment_filter, is_hidden=False, review__is_hidden=False)
+        review_rows = list(reviews.values_list('pk', 'title_id'))
+        comment_rows = list(
+            comments.values_list('pk', 'review_id', 'review__title_id'))
+        review_pks = {pk for pk, _ in review_rows}
+        # Комментарии к убранным отзывам пропадают из API вместе с ними.
+        removed_comments = {pk for pk, _, _ in comment_rows}.union(
+            Comment.objects.filter(
+                review_id__in=review_pks, is_hidden=False
+            ).values_list('pk', flat=True)
+        )
+        if action == DELETE:
+            # Комментарии удаляемых отзывов уходят каскадом.
+            comments.delete()
+            reviews.delete()
+        else:
+            comments.update(is_hidden=True)
+            reviews.update(is_hidden=True)
+        title_ids = sorted(
+            {title_id for _, title_id in review_rows}
+            | {title_id for _, _, title_id in comment_rows}
+        )
+        changed_reviews = sorted(
+            {review_id for _, review_id, _ in comment_rows} - review_pks)
+        recompute_title_aggregates(title_ids)
+        recompute_score_histograms(title_ids)
+        recompute_comment_counts(title_ids)
+        log_changes(Review, sorted(review_pks), Change.Actions.DELETED)
+        log_changes(Comment, sorted(removed_comments), Change.Actions.DELETED)
+        log_changes(Review, changed_reviews, Change.Actions.UPDATED)
+        titles_changed.send(sender=Title, title_ids=title_ids)
+        reviews_changed.send(
+            sender=Review, review_ids=changed_reviews + sorted(review_pks))
+    return {
+        'reviews': len(review_rows),
+        'comments': len(comment_rows),
+        'titles': len(title_ids),
+    }
@@ -0,0 +1,108 @@
+"""Очередь исходящих писем: запись в транзакции и пакетная доставка."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+# Пока письмо отправляется, другие обработчики его не берут.
+LEASE = timedelta(minutes=5)
+
+
+def enqueue_email(subject, body, recipient, from_email=None):
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        recipient=recipient,
+        from_email=from_email or settings.DEFAULT_EMAIL
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def pending_emails(now=None):
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        next_attempt_at__lte=now or timezone.now(),
+        attempts__lt=settings.OUTBOX_MAX_ATTEMPTS
+    )
+
+
+def claim_batch(batch_size):
+    """Забирает пачку писем, продлевая им срок следующей попытки."""
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            pending_emails(now).select_for_update(skip_locked=True)
+            .order_by('id')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(next_attempt_at=now + LEASE)
+    return emails
+
+
+def deliver_batch(batch_size=None):
+    """
+    Отправляет пачку писем через одно соединение с почтовым сервером.
+
+    Возвращает число отправленных и число неудачных писем; неудачные
+    повторяются позже с растущей задержкой.
+    """
+    emails = claim_batch(batch_size or settings.OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+    sent, failed = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email,
+                [email.recipient], connection=connection
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as error:
+                failed.append((email, error))
+            else:
+                sent.append(email.pk)
+    except Exception as error:
+        # Соединение не открылось: вся пачка уходит на повтор.
+        failed = [(email, error) for email in emails]
+    finally:
+        connection.close()
+    _record_results(sent, failed)
+    return len(sent), len(failed)
+
+
+def _record_results(sent, failed):
+    now = timezone.now()
+    with transaction.atomic():
+        OutgoingEmail.objects.filter(pk__in=sent).update(sent_at=now)
+        for email, error in failed:
+            email.attempts += 1
+            email.next_attempt_at = now + retry_delay(email.attempts)
+            email.last_error = repr(error)
+        OutgoingEmail.objects.bulk_update(
+            [email for email, _ in failed],
+            ('attempts', 'next_attempt_at', 'last_error')
+        )
+
+
+def deliver_pending(batch_size=None):
+    """Отправляет пачками всё, что готово к отправке."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = deliver_batch(batch_size)
+        if not sent and not failed:
+            return total_sent, total_failed
+        total_sent += sent
+        total_failed += failed
@@ -0,0 +1,102 @@
+"""Материализованные рейтинги лучших и самых обсуждаемых произведений."""
+from django.db import transaction
+
+from .models import Title, TitleRanking
+
+ALL_SCOPE = 'all'
+ORDERINGS = {
+    'rating': ('-rating', '-review_count', 'title_id'),
+    'reviews': ('-review_count', '-rating', 'title_id'),
+}
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def genre_scope(slug):
+    return f'genre:{slug}'
+
+
+def _build_entries(titles):
+    for title in titles:
+        scopes = [ALL_SCOPE]
+        if title.category is not None:
+            scopes.append(category_scope(title.category.slug))
+        scopes.extend(genre_scope(genre.slug) for genre in title.genre.all())
+        for scope in scopes:
+            yield TitleRanking(
+                scope=scope,
+                title=title,
+                rating=title.rating,
+                review_count=title.review_count
+            )
+
+
+def _ranked_titles():
+    return Title.objects.filter(review_count__gt=0).select_related(
+        'category').prefetch_related('genre').order_by('pk')
+
+
+def rebuild_title_rankings(title_ids):
+    """
+    Пересоздаёт строки рейтинга, например после смены жанров.
+
+    Параллельная транзакция (второй первый отзыв) могла уже вставить те же
+    строки: конфликт по unique_scope_title пропускается.
+    """
+    with transaction.atomic():
+        TitleRanking.objects.filter(title_id__in=title_ids).delete()
+        TitleRanking.objects.bulk_create(
+            _build_entries(_ranked_titles().filter(pk__in=title_ids)),
+            ignore_conflicts=True
+        )
+
+
+def sync_title_rankings(title_id, create_missing=False):
+    """
+    Переносит в рейтинг свежие агрегаты произведения.
+
+    Существующие строки обновляются на месте; создавать их заново можно
+    только когда у произведения появился первый отзыв — при каскадном
+    удалении произведения новых строк появляться не должно.
+    """
+    title = Title.objects.filter(pk=title_id).values(
+        'rating', 'review_count').first()
+    entries = TitleRanking.objects.filter(title_id=title_id)
+    if title is None or not title['review_count']:
+        entries.delete()
+        return
+    if not entries.update(**title) and create_missing:
+        rebuild_title_rankings([title_id])
+        # Строки, вставленные параллельной транзакцией, получают свежие
+        # агрегаты.
+        entries.update(**title)
+
+
+def rebuild_all_rankings(chunk_size=1000):
+    """Полностью пересобирает рейтинг; возвращает число строк."""
+    created = 0
+    with transaction.atomic():
+        TitleRanking.objects.all().delete()
+        last_id = 0
+        while True:
+            titles = list(_ranked_titles().filter(pk__gt=last_id)[:chunk_size])
+            if not titles:
+                return created
+            last_id = titles[-1].pk
+            created += len(TitleRanking.objects.bulk_create(
+                _build_entries(titles)))
+
+
+def delete_scope(scope):
+    TitleRanking.objects.filter(scope=scope).delete()
+
+
+def leaderboard(scope=ALL_SCOPE, by='rating', min_reviews=1, limit=10):
+    """Верх рейтинга области: один проход по индексу (scope, порядок)."""
+    return TitleRanking.objects.filter(
+        scope=scope, review_count__gte=min_reviews
+    ).select_related('title').only(
+        'rating', 'review_count', 'title__name'
+    ).order_by(*ORDERINGS[by])[:limit]
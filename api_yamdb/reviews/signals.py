@@ -0,0 +1,241 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import Signal, receiver
+
+from .aggregates import (apply_comment_delta, apply_review_delta,
+                         apply_score_count_delta, recompute_score_histograms,
+                         recompute_title_aggregates)
+from .changes import log_changes
+from .models import Category, Change, Comment, Genre, Review, Title
+from .rankings import (category_scope, delete_scope, genre_scope,
+                       rebuild_all_rankings, rebuild_title_rankings,
+                       sync_title_rankings)
+
+# Отправляется после массовых операций над произведениями, которые
+# обходят save() и delete(): аргумент title_ids — затронутые id
+# или None, если изменениями мог быть затронут весь каталог;
+# необязательный created_ids — какие из них созданы.
+titles_changed = Signal()
+# То же для отзывов: review_ids — отзывы, у которых изменились
+# комментарии, или сами изменённые отзывы.
+reviews_changed = Signal()
+
+_bulk = threading.local()
+
+
+@contextmanager
+def bulk_operation():
+    """
+    Отключает построчные обработчики (per_row): массовая операция сама
+    пересчитывает агрегаты, пишет журнал и сообщает об изменениях через
+    titles_changed.
+    """
+    previous = getattr(_bulk, 'active', False)
+    _bulk.active = True
+    try:
+        yield
+    finally:
+        _bulk.active = previous
+
+
+def per_row(handler):
+    """Обработчик, который пропускается внутри bulk_operation()."""
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not getattr(_bulk, 'active', False):
+            return handler(*args, **kwargs)
+    return wrapper
+
+
+@receiver(pre_save, sender=Review)
+@per_row
+def lock_review_on_save(sender, instance, raw, using, update_fields,
+                        **kwargs):
+    """
+    Читает сохранённые оценку и видимость под блокировкой строки: по ним
+    post_save считает дельту агрегатов. Значения, загруженные вместе с
+    объектом, могли устареть, если отзыв успели изменить параллельно.
+    Review.save() выполняется в транзакции, блокировка держится до
+    post_save.
+    """
+    if raw or instance._state.adding:
+        return
+    stored = Review.objects.using(using).select_for_update().filter(
+        pk=instance.pk).values_list('score', 'is_hidden').first()
+    instance._loaded_score, instance._loaded_hidden = stored or (None, None)
+    if stored and update_fields is not None and (
+            'is_hidden' not in update_fields):
+        # save() флаг не запишет: в базе остаётся решение модератора.
+        instance.is_hidden = instance._loaded_hidden
+
+
+@receiver(post_save, sender=Review)
+@per_row
+def update_title_rating_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    score = int(instance.score)
+    old_score = instance._loaded_score
+    if created:
+        if not instance.is_hidden:
+            apply_review_delta(instance.title_id, score, 1)
+            apply_score_count_delta(instance.title_id, score, 1)
+    elif (old_score is None or instance._loaded_hidden is not False
+          or instance.is_hidden):
+        # Прежняя оценка или видимость неизвестны либо отзыв скрыт:
+        # дельту посчитать не из чего.
+        recompute_title_aggregates([instance.title_id])
+        recompute_score_histograms([instance.title_id])
+    elif old_score != score:
+        apply_review_delta(instance.title_id, score - old_score, 0)
+        apply_score_count_delta(instance.title_id, old_score, -1)
+        apply_score_count_delta(instance.title_id, score, 1)
+    sync_title_rankings(instance.title_id, create_missing=created)
+
+
+@receiver(post_delete, sender=Review)
+@per_row
+def update_title_rating_on_delete(sender, instance, **kwargs):
+    # Скрытые отзывы в агрегатах не учтены.
+    if instance.is_hidden:
+        return
+    apply_review_delta(instance.title_id, -int(instance.score), -1)
+    apply_score_count_delta(instance.title_id, int(instance.score), -1)
+    sync_title_rankings(instance.title_id)
+
+
+@receiver(post_save, sender=Comment)
+@per_row
+def update_comment_count_on_save(sender, instance, created, raw, **kwargs):
+    if created and not raw and not instance.is_hidden:
+        apply_comment_delta(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+@per_row
+def update_comment_count_on_delete(sender, instance, **kwargs):
+    # При каскадном удалении отзыва комментарии удаляются раньше него,
+    # так что UPDATE безвреден.
+    if not instance.is_hidden:
+        apply_comment_delta(instance.review_id, -1)
+
+
+@receiver(post_save, sender=Title)
+def rebuild_rankings_on_title_save(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        rebuild_title_rankings([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def rebuild_rankings_on_genres_change(sender, instance, action, reverse,
+                                      pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        rebuild_title_rankings([instance.pk])
+    elif pk_set:
+        rebuild_title_rankings(pk_set)
+    else:
+        delete_scope(genre_scope(instance.slug))
+
+
+@receiver(post_delete, sender=Genre)
+def delete_genre_rankings(sender, instance, **kwargs):
+    delete_scope(genre_scope(instance.slug))
+
+
+@receiver(post_delete, sender=Category)
+def delete_category_rankings(sender, instance, **kwargs):
+    delete_scope(category_scope(instance.slug))
+
+
+@receiver(titles_changed)
+def rebuild_changed_rankings(sender, title_ids, **kwargs):
+    if title_ids is None:
+        rebuild_all_rankings()
+    else:
+        rebuild_title_rankings(title_ids)
+
+
+# Журнал изменений. Записи делаются в транзакции самой записи модели:
+# save() всех отслеживаемых моделей атомарен, удаление тоже.
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+@per_row
+def log_save(sender, instance, created, **kwargs):
+    action = Change.Actions.CREATED if created else Change.Actions.UPDATED
+    log_changes(sender, [instance.pk], action)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+@per_row
+def log_delete(sender, instance, **kwargs):
+    log_changes(sender, [instance.pk], Change.Actions.DELETED)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@per_row
+def log_title_rating_change(sender, instance, **kwargs):
+    log_changes(Title, [instance.title_id], Change.Actions.UPDATED)
+
+
+@receiver(post_save, sender=Comment)
+@per_row
+def log_comment_count_on_save(sender, instance, created, **kwargs):
+    # Правка текста комментария не меняет счётчик на отзыве.
+    if created:
+        log_changes(Review, [instance.review_id], Change.Actions.UPDATED)
+
+
+@receiver(post_delete, sender=Comment)
+@per_row
+def log_comment_count_on_delete(sender, instance, **kwargs):
+    log_changes(Review, [instance.review_id], Change.Actions.UPDATED)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def log_genres_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            log_changes(Title, [instance.pk], Change.Actions.UPDATED)
+    elif action == 'pre_clear':
+        log_changes(Title, instance.titles.values_list('pk', flat=True),
+                    Change.Actions.UPDATED)
+    elif action in ('post_add', 'post_remove'):
+        log_changes(Title, pk_set, Change.Actions.UPDATED)
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Category)
+def log_catalog_delete(sender, instance, **kwargs):
+    # Связи с произведениями удаляются без сигналов, а сами
+    # произведения меняются.
+    log_changes(Title, instance.titles.values_list('pk', flat=True),
+                Change.Actions.UPDATED)
+
+
+@receiver(titles_changed)
+def log_changed_titles(sender, title_ids, created_ids=(), **kwargs):
+    # При title_ids=None записи в журнал делает сам источник массовой
+    # операции, например import_csv.
+    if title_ids is None:
+        return
+    created_ids = set(created_ids)
+    log_changes(Title, sorted(created_ids), Change.Actions.CREATED)
+    log_changes(
+        Title, [pk for pk in title_ids if pk not in created_ids],
+        Change.Actions.UPDATED
+    )
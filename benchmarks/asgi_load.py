@@ -0,0 +1,156 @@
+"""
+Нагрузка на GET /api/v1/titles/ под ASGI (uvicorn) и WSGI (gunicorn).
+
+Под ASGI замеры идут дважды: с ASYNC_READS=0, когда Django 3.2
+выполняет все синхронные представления в одном общем потоке, и с
+ASYNC_READS=1, когда чтения уходят в пул потоков. Для каждого сервера
+печатаются запросы в секунду и задержки p50/p99.
+
+    pip install uvicorn gunicorn
+    python benchmarks/asgi_load.py --concurrency 32 --duration 10
+
+Серверы запускаются в отдельных процессах на временной базе SQLite с
+отключённым кэшем ответов, так что каждый запрос читает базу.
+"""
+import argparse
+import http.client
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb'
+sys.path.insert(0, str(PROJECT_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+os.environ['DB_NAME'] = str(Path(tempfile.mkdtemp()) / 'bench.sqlite3')
+os.environ['TITLES_CACHE_TIMEOUT'] = '0'
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+
+from reviews.models import Category, Genre, Title  # noqa: E402
+
+HOST = '127.0.0.1'
+URL = '/api/v1/titles/'
+
+
+def seed(count):
+    call_command('migrate', verbosity=0)
+    category = Category.objects.create(name='Фильм', slug='films')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    for idx in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category)
+        title.genre.add(genre)
+
+
+def servers(args):
+    """Название, команда запуска и окружение для каждого сервера."""
+    uvicorn = [
+        sys.executable, '-m', 'uvicorn', 'api_yamdb.asgi:application',
+        '--host', HOST, '--port', str(args.port),
+        '--workers', str(args.workers), '--log-level', 'warning',
+    ]
+    gunicorn = [
+        sys.executable, '-m', 'gunicorn', 'api_yamdb.wsgi',
+        '--bind', f'{HOST}:{args.port}', '--workers', str(args.workers),
+        '--threads', str(args.threads), '--log-level', 'warning',
+    ]
+    return [
+        ('uvicorn, ASYNC_READS=0', uvicorn, {'ASYNC_READS': '0'}),
+        ('uvicorn, ASYNC_READS=1', uvicorn, {'ASYNC_READS': '1'}),
+        (f'gunicorn, {args.threads} потоков', gunicorn, {}),
+    ]
+
+
+def get(port):
+    connection = http.client.HTTPConnection(HOST, port, timeout=30)
+    try:
+        connection.request('GET', URL)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def wait_ready(port, process):
+    for _ in range(100):
+        if process.poll() is not None:
+            raise SystemExit('Сервер завершился при запуске.')
+        try:
+            if get(port) == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise SystemExit('Сервер не ответил за 10 секунд.')
+
+
+def load(port, deadline):
+    latencies = []
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        if get(port) != 200:
+            raise SystemExit(f'{URL} ответил ошибкой.')
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def bench(name, command, env, args):
+    process = subprocess.Popen(
+        command, cwd=PROJECT_DIR, env={**os.environ, **env})
+    try:
+        wait_ready(args.port, process)
+        deadline = time.perf_counter() + args.duration
+        with ThreadPoolExecutor(args.concurrency) as executor:
+            latencies = sorted(
+                latency for future in [
+                    executor.submit(load, args.port, deadline)
+                    for _ in range(args.concurrency)
+                ] for latency in future.result()
+            )
+    finally:
+        process.terminate()
+        process.wait()
+    p50, p99 = (
+        statistics.quantiles(latencies, n=100)[idx] * 1000
+        for idx in (49, 98)
+    )
+    print(
+        f'{name:<24} {len(latencies) / args.duration:8.1f} запр./с  '
+        f'p50 {p50:6.1f} мс  p99 {p99:6.1f} мс', flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--titles', type=int, default=50)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    missing = [
+        module for module in ('uvicorn', 'gunicorn')
+        if importlib.util.find_spec(module) is None
+    ]
+    if missing:
+        raise SystemExit(f'Установите {", ".join(missing)}.')
+    seed(args.titles)
+    for name, command, env in servers(args):
+        bench(name, command, env, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Пропускная способность регистрации и получения токена.
+
+Прогоняет N пар запросов POST /auth/signup/ и POST /auth/token/ через
+тестовый клиент Django на временной базе и печатает число запросов в
+секунду и число SQL-запросов на один вызов каждого эндпоинта.
+
+Запуск из корня репозитория:
+
+    python benchmarks/auth_flow.py --users 500
+
+Чтобы сравнить с предыдущей версией, запустите скрипт на обоих коммитах.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import (CaptureQueriesContext,  # noqa: E402
+                               setup_test_environment)
+
+from reviews.models import OutgoingEmail  # noqa: E402
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+
+
+def measure(client, url, payloads, expected_status):
+    """Отправляет запросы по очереди; возвращает секунды и SQL-запросы."""
+    elapsed = 0
+    with CaptureQueriesContext(connection) as context:
+        for data in payloads:
+            started = time.perf_counter()
+            response = client.post(url, data=data)
+            elapsed += time.perf_counter() - started
+            if response.status_code != expected_status:
+                raise SystemExit(
+                    f'{url} ответил {response.status_code}: '
+                    f'{response.content[:200]!r}'
+                )
+    return elapsed, len(context)
+
+
+def report(name, count, elapsed, queries):
+    print(
+        f'{name:<8} {count / elapsed:8.1f} запр./с  '
+        f'{queries / count:5.1f} SQL на запрос'
+    )
+
+
+def run(users):
+    client = Client()
+    signups = [
+        {'username': f'bench_{idx}', 'email': f'bench_{idx}@yamdb.fake'}
+        for idx in range(users)
+    ]
+    elapsed, queries = measure(client, URL_SIGNUP, signups, 200)
+    report('signup', users, elapsed, queries)
+
+    codes = dict(OutgoingEmail.objects.values_list('recipient', 'body'))
+    tokens = [
+        {
+            'username': data['username'],
+            'confirmation_code': codes[data['email']],
+        }
+        for data in signups
+    ]
+    elapsed, queries = measure(client, URL_TOKEN, tokens, 200)
+    report('token', users, elapsed, queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--users', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        run(args.users)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
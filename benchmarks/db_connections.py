@@ -0,0 +1,105 @@
+"""
+Запросы в секунду на GET /api/v1/titles/ с новым соединением на каждый
+запрос и с сохранёнными соединениями.
+
+Запросы идут прямо в WSGI-приложение, поэтому соединения открываются и
+закрываются так же, как под gunicorn (тестовый клиент Django их не
+закрывает). Кэш ответов отключён, каждый запрос читает базу. База берётся
+из переменных окружения DB_*, как в настройках проекта, например для
+PostgreSQL за PgBouncer:
+
+    DB_ENGINE=django.db.backends.postgresql DB_NAME=yamdb DB_USER=yamdb \\
+    DB_PASSWORD=... DB_HOST=127.0.0.1 DB_PORT=6432 \\
+    python benchmarks/db_connections.py --requests 2000
+
+Скрипт создаёт и удаляет тестовую базу test_<DB_NAME>.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ['TITLES_CACHE_TIMEOUT'] = '0'
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.backends.signals import connection_created  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from reviews.models import Category, Genre, Title  # noqa: E402
+
+URL = '/api/v1/titles/'
+
+
+def seed(count):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    for idx in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category)
+        title.genre.add(genre)
+
+
+def run(application, requests, conn_max_age):
+    connection.close()
+    connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+    opened = []
+    connection_created.connect(
+        lambda **kwargs: opened.append(1), weak=False, dispatch_uid='bench')
+
+    def start_response(status, headers):
+        if not status.startswith('200'):
+            raise SystemExit(f'{URL} ответил {status}')
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        environ = {'PATH_INFO': URL, 'REQUEST_METHOD': 'GET'}
+        setup_testing_defaults(environ)
+        response = application(environ, start_response)
+        b''.join(response)
+        response.close()
+    elapsed = time.perf_counter() - started
+    connection_created.disconnect(dispatch_uid='bench')
+    return requests / elapsed, len(opened)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--titles', type=int, default=10)
+    parser.add_argument(
+        '--conn-max-age', type=int, default=60,
+        help='CONN_MAX_AGE для прогона с сохранёнными соединениями')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(args.titles)
+        application = get_wsgi_application()
+        print(f'{connection.vendor}, {args.requests} запросов к {URL}')
+        for name, conn_max_age in (
+            ('на запрос', 0),
+            ('сохранённые', args.conn_max_age),
+        ):
+            rps, opened = run(application, args.requests, conn_max_age)
+            print(
+                f'{name:<12} {rps:8.1f} запр./с  '
+                f'открыто соединений: {opened}'
+            )
+    finally:
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = 0
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Время рендеринга и разбора JSON для больших страниц произведений.
+
+Страница — вывод TitleReadSerializer для --page-size произведений с
+названиями из static/data/titles.csv. Печатается время на страницу для
+JSONRenderer/JSONParser и FastJSONRenderer/FastJSONParser, с orjson, если
+он установлен:
+
+    python benchmarks/json_render.py --page-size 1000 --repeat 50
+
+Скрипт создаёт и удаляет тестовую базу.
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import timeit
+from itertools import cycle, islice
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb'
+sys.path.insert(0, str(PROJECT_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.parsers import FastJSONParser  # noqa: E402
+from api.renderers import FastJSONRenderer, orjson  # noqa: E402
+from api.serializers import TitleReadSerializer  # noqa: E402
+from reviews.models import Category, Genre, Title  # noqa: E402
+
+TITLES_CSV = PROJECT_DIR / 'static' / 'data' / 'titles.csv'
+
+
+def page(size):
+    """Страница в том виде, в каком её получает рендерер."""
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=name, slug=slug)
+        for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'))
+    ]
+    with open(TITLES_CSV, encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    for row in islice(cycle(rows), size):
+        title = Title.objects.create(
+            name=row['name'], year=row['year'], category=category,
+            description=f'Описание произведения «{row["name"]}»')
+        title.genre.set(genres)
+    queryset = Title.objects.select_related(
+        'category').prefetch_related('genre')
+    return {
+        'count': size, 'next': None, 'previous': None,
+        'results': TitleReadSerializer(queryset, many=True).data,
+    }
+
+
+def measure(name, function, repeat):
+    seconds = min(timeit.repeat(function, number=1, repeat=repeat))
+    print(f'  {name:<16} {seconds * 1000:8.2f} мс на страницу')
+    return seconds
+
+
+def run(args):
+    data = page(args.page_size)
+    body = JSONRenderer().render(data)
+    if FastJSONRenderer().render(data) != body:
+        raise SystemExit('Рендереры отдали разные байты.')
+    print(f'Страница: {args.page_size} произведений, {len(body)} байт')
+    print('Рендеринг:')
+    slow = measure(
+        'JSONRenderer', lambda: JSONRenderer().render(data), args.repeat)
+    fast = measure(
+        'FastJSONRenderer', lambda: FastJSONRenderer().render(data),
+        args.repeat)
+    print(f'  ускорение: {slow / fast:.1f}x')
+    print('Разбор:')
+    slow = measure(
+        'JSONParser', lambda: JSONParser().parse(io.BytesIO(body)),
+        args.repeat)
+    fast = measure(
+        'FastJSONParser', lambda: FastJSONParser().parse(io.BytesIO(body)),
+        args.repeat)
+    print(f'  ускорение: {slow / fast:.1f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    if orjson is None:
+        print('orjson не установлен: замеряется запасной вариант.')
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
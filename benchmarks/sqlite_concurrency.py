@@ -0,0 +1,151 @@
+"""
+Конкурентные чтения и записи на SQLite: обычный бэкенд против
+api_yamdb.sqlite_tuned.
+
+Писатели в нескольких потоках публикуют отзывы через POST
+/api/v1/titles/{id}/reviews/, читатели одновременно листают
+GET /api/v1/titles/{id}/reviews/. Для каждого бэкенда печатаются
+запросы в секунду и число ошибок «database is locked».
+
+    python benchmarks/sqlite_concurrency.py --writers 8 --readers 8
+
+Каждый бэкенд запускается в отдельном процессе (DB_ENGINE) на своей
+временной базе.
+"""
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ['TITLES_CACHE_TIMEOUT'] = '0'
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import OperationalError, connection, connections  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from reviews.models import Title  # noqa: E402
+
+ENGINES = ('django.db.backends.sqlite3', 'api_yamdb.sqlite_tuned')
+REVIEWS_URL_TEMPLATE = '/api/v1/titles/{}/reviews/'
+
+
+def request(method, *args):
+    """1 — запрос выполнен, 0 — упал на блокировке базы."""
+    try:
+        method(*args)
+    except OperationalError:
+        return 0
+    return 1
+
+
+def write(author, title_ids):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(author)}')
+    try:
+        return [
+            request(client.post, REVIEWS_URL_TEMPLATE.format(title_id),
+                    {'text': 'Отзыв', 'score': 7})
+            for title_id in title_ids
+        ]
+    finally:
+        connections.close_all()
+
+
+def read(title_ids, stop):
+    client = APIClient()
+    results = []
+    try:
+        while not stop.is_set():
+            results.extend(
+                request(client.get, REVIEWS_URL_TEMPLATE.format(title_id))
+                for title_id in title_ids
+            )
+    finally:
+        connections.close_all()
+    return results
+
+
+def report(name, results, elapsed):
+    done = sum(map(sum, results))
+    locked = sum(map(len, results)) - done
+    print(
+        f'  {name:<7} {done / elapsed:8.1f} запр./с  '
+        f'database is locked: {locked}'
+    )
+
+
+def bench(args):
+    # Ошибки блокировки считаются, трассировки в логе не нужны.
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    User = get_user_model()
+    authors = [
+        User.objects.create(
+            username=f'bench_{idx}', email=f'bench_{idx}@yamdb.fake')
+        for idx in range(args.writers)
+    ]
+    title_ids = [
+        Title.objects.create(name=f'Произведение {idx}', year=2000).id
+        for idx in range(args.titles)
+    ]
+    connection.close()
+
+    # Читатели работают, пока не закончат писатели.
+    stop = threading.Event()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.writers + args.readers) as executor:
+        readers = [
+            executor.submit(read, title_ids, stop)
+            for _ in range(args.readers)
+        ]
+        written = [
+            future.result() for future in [
+                executor.submit(write, author, title_ids)
+                for author in authors
+            ]
+        ]
+        elapsed = time.perf_counter() - started
+        stop.set()
+        report('запись', written, elapsed)
+        report('чтение', [future.result() for future in readers], elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--titles', type=int, default=50)
+    parser.add_argument('--engine', choices=ENGINES)
+    args = parser.parse_args()
+    if args.engine is None:
+        for engine in ENGINES:
+            print(engine, flush=True)
+            subprocess.run(
+                [sys.executable, __file__, *sys.argv[1:], '--engine', engine],
+                env={**os.environ, 'DB_ENGINE': engine}, check=True
+            )
+        return
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        bench(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,8 @@ import pytest
 from django.core import mail
 from django.db.utils import IntegrityError
 
-from tests.utils import (invalid_data_for_user_patch_and_creation,
+from tests.utils import (deliver_outbox,
+                         invalid_data_for_user_patch_and_creation,
                          invalid_data_for_username_and_email_fields)
 
 
@@ -110,6 +111,7 @@ class Test00UserRegistration:
         }
 
         response = client.post(self.URL_SIGNUP, data=valid_data)
+        deliver_outbox()
         outbox_after = mail.outbox  # email outbox after user create
 
         assert response.status_code != HTTPStatus.NOT_FOUND, (
@@ -159,6 +161,7 @@ class Test00UserRegistration:
         response = admin_client.post(
             self.URL_ADMIN_CREATE_USER, data=valid_data
         )
+        deliver_outbox()
         outbox_after = mail.outbox
 
         assert response.status_code != HTTPStatus.NOT_FOUND, (
@@ -0,0 +1,150 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_title(self, title_id):
+        from reviews.models import Title
+        return Title.objects.get(pk=title_id)
+
+    def test_01_rating_follows_review_writes(self, admin_client, admin,
+                                             user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title = self.get_title(titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (
+            10, 2, 5), (
+            'Проверьте, что при создании отзыва сумма оценок, число отзывов '
+            'и рейтинг произведения обновляются.'
+        )
+
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[1]['id']),
+            data={'score': 8}
+        )
+        title = self.get_title(titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (
+            13, 2, 6), (
+            'Проверьте, что при изменении оценки отзыва агрегаты '
+            'произведения пересчитываются.'
+        )
+
+        admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id'])
+        )
+        title = self.get_title(titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (
+            8, 1, 8), (
+            'Проверьте, что при удалении отзыва агрегаты произведения '
+            'пересчитываются.'
+        )
+
+        user.delete()
+        title = self.get_title(titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (
+            0, 0, None), (
+            'Проверьте, что при каскадном удалении отзывов вместе с автором '
+            'агрегаты произведения пересчитываются.'
+        )
+
+    def test_02_recompute_ratings_repairs_drift(self, admin_client,
+                                                user_client):
+        from reviews.models import Title
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        Title.objects.filter(pk=titles[0]['id']).update(
+            score_sum=100, review_count=3, rating=33)
+
+        out = StringIO()
+        call_command('recompute_ratings', '--chunk-size=1', stdout=out)
+        title = self.get_title(titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (
+            9, 1, 9), (
+            'Проверьте, что команда `recompute_ratings` исправляет '
+            'разошедшиеся агрегаты произведений.'
+        )
+        assert 'расхождений: 1' in out.getvalue()
+
+    def test_03_update_keeps_concurrent_aggregates(self, admin_client,
+                                                   admin, user_client,
+                                                   monkeypatch):
+        from api.views import ReviewViewSet, TitleViewSet
+        from reviews.models import Comment, Review
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            user_client, title_id, 'Отзыв', 9).json()['id']
+
+        def write_between(viewset, write):
+            """Чужая запись между get_object() и save()."""
+            perform_update = viewset.perform_update
+
+            def perform_update_after_write(view, serializer):
+                write()
+                perform_update(view, serializer)
+
+            monkeypatch.setattr(
+                viewset, 'perform_update', perform_update_after_write)
+
+        write_between(TitleViewSet, lambda: Review.objects.create(
+            title_id=title_id, author=admin, text='Ещё отзыв', score=1))
+        response = admin_client.patch(
+            f'/api/v1/titles/{title_id}/', data={'name': 'Новое название'})
+        assert response.status_code == HTTPStatus.OK
+        title = self.get_title(title_id)
+        assert (title.name, title.score_sum, title.review_count,
+                title.rating) == ('Новое название', 10, 2, 5), (
+            'Проверьте, что изменение произведения не перезаписывает '
+            'агрегаты, изменённые после его чтения.'
+        )
+
+        write_between(ReviewViewSet, lambda: Comment.objects.create(
+            review_id=review_id, author=admin, text='Комментарий'))
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id),
+            data={'text': 'Новый текст'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        review = Review.objects.get(pk=review_id)
+        assert (review.text, review.comment_count) == ('Новый текст', 1), (
+            'Проверьте, что изменение отзыва не перезаписывает число '
+            'комментариев.'
+        )
+
+    def test_04_stale_review_instances(self, admin_client, user_client):
+        from reviews.models import Review, ScoreCount
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            user_client, title_id, 'Отзыв', 5).json()['id']
+        first = Review.objects.get(pk=review_id)
+        second = Review.objects.get(pk=review_id)
+        first.score = 2
+        first.save()
+        second.score = 9
+        second.save()
+
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.review_count, title.rating) == (
+            9, 1, 9), (
+            'Проверьте, что дельта рейтинга считается от оценки в базе, а не '
+            'от загруженной вместе с устаревшим объектом.'
+        )
+        histogram = dict(ScoreCount.objects.filter(
+            title_id=title_id, count__gt=0).values_list('score', 'count'))
+        assert histogram == {9: 1}
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def test_01_list_is_cached_per_query_string(self, client, admin_client):
+        create_titles(admin_client)
+
+        response = client.get(self.TITLES_URL)
+        assert response['X-Cache'] == 'MISS'
+        cached = client.get(self.TITLES_URL)
+        assert cached['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{self.TITLES_URL}` '
+            'отдаётся из кэша.'
+        )
+        assert cached.json() == response.json()
+
+        response = client.get(self.TITLES_URL, {'year': 1984})
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что ключ кэша учитывает параметры запроса.'
+        )
+        assert response.json()['count'] == 1
+
+    def test_02_review_invalidates_title(self, client, admin_client,
+                                         user_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = self.TITLES_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'])
+        client.get(self.TITLES_URL)
+        client.get(detail_url)
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 9, (
+            'Проверьте, что новый отзыв сбрасывает кэш карточки '
+            'произведения.'
+        )
+        response = client.get(self.TITLES_URL)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кэш списка произведений.'
+        )
+
+        other_url = self.TITLES_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[1]['id'])
+        client.get(other_url)
+        create_single_review(user_client, titles[1]['id'], 'Так себе', 3)
+        assert client.get(detail_url)['X-Cache'] == 'HIT', (
+            'Проверьте, что отзыв на одно произведение не сбрасывает кэш '
+            'карточек других произведений.'
+        )
+
+    def test_03_genre_change_invalidates_all(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        detail_url = self.TITLES_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'])
+        client.get(detail_url)
+
+        response = admin_client.delete(
+            f'{self.GENRES_URL}{genres[0]["slug"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'MISS'
+        assert genres[0] not in response.json()['genre'], (
+            'Проверьте, что удаление жанра сбрасывает кэш произведений.'
+        )
+
+    def test_04_stats_need_shared_cache(self, client, settings, tmp_path):
+        with pytest.raises(CommandError):
+            call_command('titles_cache_stats')
+
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }}
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        out = StringIO()
+        call_command('titles_cache_stats', stdout=out)
+        assert 'Попаданий: 1, промахов: 1' in out.getvalue(), (
+            'Проверьте, что команда читает счётчики из общего кэша.'
+        )
@@ -0,0 +1,193 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_comment, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10QueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def create_authors(self, django_user_model, count):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+        clients = []
+        for idx in range(count):
+            author = django_user_model.objects.create_user(
+                username=f'author_{idx}', email=f'author_{idx}@yamdb.fake')
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(author)}')
+            clients.append(client)
+        return clients
+
+    def create_titles(self, count):
+        from reviews.models import Category, Genre, Title
+        category, _ = Category.objects.get_or_create(
+            name='Фильм', slug='films')
+        genres = [
+            Genre.objects.get_or_create(name='Драма', slug='drama')[0],
+            Genre.objects.get_or_create(name='Комедия', slug='comedy')[0],
+        ]
+        titles = []
+        for idx in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category)
+            title.genre.set(genres)
+            titles.append(title)
+        return titles
+
+    # Загрузка родительского объекта вложенного маршрута целиком.
+    TITLE_LOOKUP = re.compile(
+        r'^SELECT "reviews_title"\."id", .* '
+        r'FROM "reviews_title" WHERE "reviews_title"\."id" ='
+    )
+    REVIEW_LOOKUP = re.compile(
+        r'^SELECT "reviews_review"\."id", .* '
+        r'FROM "reviews_review" WHERE \("reviews_review"\."id" ='
+    )
+
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        return len(context)
+
+    def test_01_titles_list(self, client):
+        self.create_titles(1)
+        few = self.count_queries(client, self.TITLES_URL)
+        self.create_titles(4)
+        many = self.count_queries(client, self.TITLES_URL)
+        assert few == many, (
+            f'Проверьте, что число запросов к базе при GET-запросе к '
+            f'`{self.TITLES_URL}` не зависит от размера страницы: '
+            f'{few} для одного произведения и {many} для пяти.'
+        )
+
+    def test_02_reviews_list(self, client, django_user_model):
+        title = self.create_titles(1)[0]
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        authors = self.create_authors(django_user_model, 5)
+        create_single_review(authors[0], title.id, 'Отзыв', 5)
+        few = self.count_queries(client, url)
+        for author in authors[1:]:
+            create_single_review(author, title.id, 'Отзыв', 5)
+        many = self.count_queries(client, url)
+        assert few == many, (
+            f'Проверьте, что число запросов к базе при GET-запросе к '
+            f'`{self.REVIEWS_URL_TEMPLATE}` не зависит от размера страницы: '
+            f'{few} для одного отзыва и {many} для пяти.'
+        )
+
+    def test_03_comments_list(self, client, django_user_model):
+        title = self.create_titles(1)[0]
+        authors = self.create_authors(django_user_model, 5)
+        review_id = create_single_review(
+            authors[0], title.id, 'Отзыв', 5).json()['id']
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review_id)
+        create_single_comment(authors[0], title.id, review_id, 'Коммент')
+        few = self.count_queries(client, url)
+        for author in authors[1:]:
+            create_single_comment(author, title.id, review_id, 'Коммент')
+        many = self.count_queries(client, url)
+        assert few == many, (
+            f'Проверьте, что число запросов к базе при GET-запросе к '
+            f'`{self.COMMENTS_URL_TEMPLATE}` не зависит от размера страницы: '
+            f'{few} для одного комментария и {many} для пяти.'
+        )
+
+    def capture(self, client, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, data=data)
+        assert response.status_code < 400, (
+            f'Запрос {method.upper()} к `{url}` вернул '
+            f'{response.status_code}.'
+        )
+        return [query['sql'] for query in context]
+
+    def check_nested_queries(self, queries, action, lookup):
+        lookups = [sql for sql in queries if lookup.search(sql)]
+        assert len(lookups) <= 1, (
+            f'Проверьте, что при действии {action} родительский объект '
+            f'загружается не больше одного раза за запрос, сейчас '
+            f'{len(lookups)}.'
+        )
+        selects = [sql for sql in queries if sql.startswith('SELECT')]
+        assert len(selects) == len(set(selects)), (
+            f'Проверьте, что при действии {action} одинаковые SELECT-запросы '
+            'не повторяются в пределах одного запроса.'
+        )
+
+    def test_04_nested_review_actions(self, django_user_model):
+        title = self.create_titles(1)[0]
+        author = self.create_authors(django_user_model, 1)[0]
+        list_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+
+        queries = self.capture(
+            author, 'post', list_url, {'text': 'Отзыв', 'score': 5})
+        self.check_nested_queries(queries, 'create', self.TITLE_LOOKUP)
+        review_id = title.review.get().id
+        detail_url = f'{list_url}{review_id}/'
+        for action, method, url, data in (
+            ('list', 'get', list_url, None),
+            ('retrieve', 'get', detail_url, None),
+            ('partial_update', 'patch', detail_url, {'score': 7}),
+            ('destroy', 'delete', detail_url, None),
+        ):
+            queries = self.capture(author, method, url, data)
+            self.check_nested_queries(queries, action, self.TITLE_LOOKUP)
+
+    def test_05_nested_comment_actions(self, django_user_model):
+        title = self.create_titles(1)[0]
+        author = self.create_authors(django_user_model, 1)[0]
+        review_id = create_single_review(
+            author, title.id, 'Отзыв', 5).json()['id']
+        list_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review_id)
+
+        queries = self.capture(author, 'post', list_url, {'text': 'Коммент'})
+        self.check_nested_queries(queries, 'create', self.REVIEW_LOOKUP)
+        assert not any(map(self.TITLE_LOOKUP.search, queries)), (
+            'Проверьте, что принадлежность отзыва произведению проверяется '
+            'тем же запросом, что загружает отзыв.'
+        )
+        comment_id = author.get(list_url).json()['results'][0]['id']
+        detail_url = f'{list_url}{comment_id}/'
+        for action, method, url, data in (
+            ('list', 'get', list_url, None),
+            ('retrieve', 'get', detail_url, None),
+            ('partial_update', 'patch', detail_url, {'text': 'Другой'}),
+            ('destroy', 'delete', detail_url, None),
+        ):
+            queries = self.capture(author, method, url, data)
+            self.check_nested_queries(queries, action, self.REVIEW_LOOKUP)
+            assert not any(map(self.TITLE_LOOKUP.search, queries))
+
+    def test_06_signup(self, client):
+        url = '/api/v1/auth/signup/'
+        for data, status in (
+            ({'username': 'new_user', 'email': 'new@yamdb.fake'}, 200),
+            ({'username': 'new_user', 'email': 'new@yamdb.fake'}, 200),
+            ({'username': 'new_user', 'email': 'other@yamdb.fake'}, 400),
+            ({'username': 'other_user', 'email': 'new@yamdb.fake'}, 400),
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = client.post(url, data=data)
+            assert response.status_code == status
+            queries = [
+                query['sql'] for query in context
+                if '"reviews_user"' in query['sql']
+            ]
+            assert len(queries) <= 2, (
+                f'Проверьте, что регистрация {data} обращается к таблице '
+                f'пользователей не больше двух раз, сейчас {len(queries)}: '
+                f'{queries}'
+            )
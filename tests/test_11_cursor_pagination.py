@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def walk(self, client, url):
+        items = []
+        with CaptureQueriesContext(connection) as context:
+            while url:
+                data = client.get(url).json()
+                assert 'count' not in data, (
+                    'Проверьте, что в курсорном режиме пагинации ответ не '
+                    'содержит ключ `count`.'
+                )
+                items.extend(data['results'])
+                url = data['next']
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что курсорная пагинация не выполняет COUNT-запросов.'
+        return items
+
+    def test_01_titles_cursor(self, client):
+        from reviews.models import Title
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000) for idx in range(12)
+        )
+        items = self.walk(client, f'{self.TITLES_URL}?cursor=')
+        ids = [item['id'] for item in items]
+        assert ids == sorted(Title.objects.values_list('id', flat=True)), (
+            f'Проверьте, что курсорная пагинация `{self.TITLES_URL}` '
+            'возвращает все произведения по возрастанию id без повторов.'
+        )
+
+        data = client.get(self.TITLES_URL).json()
+        assert data['count'] == 12, (
+            'Проверьте, что без параметра `cursor` сохраняется номерная '
+            'пагинация.'
+        )
+
+    def test_02_reviews_cursor(self, client, admin_client, django_user_model):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+        authors_map = {}
+        for idx in range(7):
+            author = django_user_model.objects.create_user(
+                username=f'author_{idx}', email=f'author_{idx}@yamdb.fake')
+            author_client = APIClient()
+            author_client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(author)}')
+            authors_map[author] = author_client
+        reviews, titles = create_reviews(admin_client, authors_map)
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        items = self.walk(client, f'{url}?cursor=')
+        assert sorted(item['id'] for item in items) == sorted(
+            review['id'] for review in reviews), (
+            f'Проверьте, что курсорная пагинация `{self.REVIEWS_URL_TEMPLATE}`'
+            ' возвращает все отзывы без повторов.'
+        )
+        dates = [item['pub_date'] for item in items]
+        assert dates == sorted(dates, reverse=True), (
+            'Проверьте, что отзывы в курсорном режиме отсортированы по '
+            'убыванию даты публикации.'
+        )
@@ -0,0 +1,47 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ImportCsv:
+
+    def test_01_import_static_data(self):
+        from reviews.models import Comment, Review, Title, User
+        out = StringIO()
+        call_command('import_csv', '--batch-size=10', stdout=out)
+
+        assert User.objects.count() == 5
+        assert Title.objects.count() == 32
+        assert Title.genre.through.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+
+        review = Review.objects.get(pk=1)
+        assert review.author.username == 'bingobongo'
+        expected_date = '2019-09-24T21:08:21.567000+00:00'
+        assert review.pub_date.isoformat() == expected_date, (
+            'Проверьте, что команда `import_csv` сохраняет `pub_date` '
+            'из файла.'
+        )
+        title = Title.objects.get(pk=1)
+        assert (title.review_count, title.rating) == (2, 10), (
+            'Проверьте, что после импорта рейтинги произведений '
+            'пересчитываются.'
+        )
+        assert 'titles.csv: 32 строк' in out.getvalue()
+
+        from reviews.models import Change
+        created = Change.objects.filter(action='created')
+        assert created.filter(model='review').count() == 72, (
+            'Проверьте, что команда `import_csv` пишет загруженные объекты '
+            'в журнал изменений.'
+        )
+        assert created.filter(model='title').count() == 32
+
+    def test_02_import_is_repeatable(self):
+        from reviews.models import Review
+        call_command('import_csv', stdout=StringIO())
+        call_command('import_csv', '--ignore-conflicts', stdout=StringIO())
+        assert Review.objects.count() == 72
@@ -0,0 +1,110 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleBulk:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+
+    def test_01_bulk_permissions(self, client, user_client):
+        response = client.post(
+            self.BULK_URL, data='[]', content_type='application/json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.post(self.BULK_URL, data=[], format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что POST-запрос пользователя к `{self.BULK_URL}` '
+            'возвращает ответ со статусом 403.'
+        )
+
+    def test_02_bulk_create_and_update(self, admin_client):
+        from reviews.models import Title
+        titles, categories, genres = create_titles(admin_client)
+        data = [
+            {
+                'name': f'Новое произведение {idx}',
+                'year': 2000 + idx,
+                'genre': [genres[0]['slug'], genres[2]['slug']],
+                'category': categories[1]['slug'],
+            }
+            for idx in range(20)
+        ]
+        data.append({'id': titles[0]['id'], 'name': 'Терминатор 2',
+                     'genre': [genres[2]['slug']]})
+
+        response = admin_client.post(self.BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Если POST-запрос администратора к `{self.BULK_URL}` содержит '
+            'корректные данные - должен вернуться ответ со статусом 200.'
+        )
+        result = response.json()
+        assert len(result) == 21
+        result_genres = sorted(
+            result[0]['genre'], key=lambda genre: genre['slug'])
+        assert result_genres == [
+            genres[2], genres[0]]
+        assert result[0]['category'] == categories[1]
+        assert Title.objects.count() == 22
+
+        updated = result[-1]
+        assert updated['id'] == titles[0]['id']
+        assert updated['name'] == 'Терминатор 2'
+        assert updated['year'] == titles[0]['year']
+        assert updated['genre'] == [genres[2]], (
+            f'Проверьте, что POST-запрос к `{self.BULK_URL}` с `id` '
+            'обновляет жанры существующего произведения.'
+        )
+
+    def test_03_bulk_resolves_slugs_once(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        item = {'name': 'Произведение', 'year': 2000,
+                'genre': [genres[0]['slug']],
+                'category': categories[0]['slug']}
+        with CaptureQueriesContext(connection) as context:
+            admin_client.post(self.BULK_URL, data=[item], format='json')
+        few = len(context)
+        with CaptureQueriesContext(connection) as context:
+            admin_client.post(self.BULK_URL, data=[item] * 30, format='json')
+        slug_queries = [
+            query['sql'] for query in context.captured_queries
+            if '"slug" IN' in query['sql']
+        ]
+        assert len(slug_queries) == 2, (
+            'Проверьте, что слаги жанров и категорий разрешаются одним '
+            'запросом на каждый тип.'
+        )
+        if connection.features.can_return_rows_from_bulk_insert:
+            assert len(context) == few
+
+    def test_04_bulk_errors_per_item(self, admin_client):
+        from reviews.models import Title
+        _, categories, genres = create_titles(admin_client)
+        data = [
+            {'name': 'Верное', 'year': 2000, 'genre': [genres[0]['slug']]},
+            {'name': 'Без жанра', 'year': 2000, 'genre': ['unknown']},
+            {'id': 999, 'name': 'Несуществующее'},
+            {'year': 2000, 'genre': [genres[0]['slug']],
+             'category': 'unknown'},
+            {'name': 'Длинное', 'year': 2000, 'genre': [genres[0]['slug']],
+             'description': 'а' * 257},
+        ]
+        response = admin_client.post(self.BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'genre' in errors[1]
+        assert 'id' in errors[2]
+        assert 'name' in errors[3]
+        assert 'description' in errors[4], (
+            'Проверьте, что описание ограничено так же, как при создании '
+            'одного произведения.'
+        )
+        assert Title.objects.count() == 2, (
+            'Проверьте, что при ошибке в любом элементе ни одно '
+            'произведение не сохраняется.'
+        )
@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ScoreHistogram:
+
+    TITLES_URL = '/api/v1/titles/'
+    HISTOGRAM_URL_TEMPLATE = '/api/v1/titles/{title_id}/histogram/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def expected(self, **counts):
+        histogram = {str(score): 0 for score in range(1, 11)}
+        histogram.update(counts)
+        return histogram
+
+    def test_01_histogram_endpoint(self, client, admin_client, admin,
+                                   user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client})
+        url = self.HISTOGRAM_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == self.expected(**{'5': 2}), (
+            f'Проверьте, что `{self.HISTOGRAM_URL_TEMPLATE}` возвращает '
+            'число отзывов с каждой оценкой.'
+        )
+
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[1]['id']),
+            data={'score': 9}
+        )
+        assert client.get(url).json() == self.expected(**{'5': 1, '9': 1})
+
+        admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id'])
+        )
+        assert client.get(url).json() == self.expected(**{'9': 1})
+
+        response = client.get(
+            self.HISTOGRAM_URL_TEMPLATE.format(title_id=999))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_optional_histogram_field(self, client, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+
+        title = client.get(self.TITLES_URL).json()['results'][0]
+        assert 'histogram' not in title, (
+            'Проверьте, что по умолчанию поле `histogram` не выводится.'
+        )
+        title = client.get(
+            self.TITLES_URL, {'include': 'histogram'}).json()['results'][0]
+        assert title['histogram'] == self.expected(**{'5': 1}), (
+            'Проверьте, что при `?include=histogram` в ответе есть '
+            'гистограмма оценок.'
+        )
@@ -0,0 +1,125 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Leaderboard:
+
+    LEADERBOARD_URL = '/api/v1/titles/leaderboard/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_top_rated_and_most_reviewed(self, client, admin_client,
+                                            user_client, moderator_client):
+        titles, categories, genres = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        create_single_review(admin_client, first, 'Хорошо', 6)
+        create_single_review(user_client, first, 'Отлично', 8)
+        create_single_review(moderator_client, second, 'Шедевр', 10)
+
+        response = client.get(self.LEADERBOARD_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{self.LEADERBOARD_URL}` должен быть доступен '
+            'неавторизованному пользователю.'
+        )
+        assert [item['id'] for item in response.json()] == [second, first]
+        assert response.json()[0] == {
+            'id': second, 'name': titles[1]['name'],
+            'rating': 10, 'review_count': 1
+        }
+
+        data = client.get(self.LEADERBOARD_URL, {'by': 'reviews'}).json()
+        assert [item['id'] for item in data] == [first, second]
+
+        data = client.get(self.LEADERBOARD_URL, {'min_reviews': 2}).json()
+        assert [item['id'] for item in data] == [first], (
+            'Проверьте, что параметр `min_reviews` отсекает произведения '
+            'с меньшим числом отзывов.'
+        )
+
+        data = client.get(
+            self.LEADERBOARD_URL, {'genre': genres[0]['slug']}).json()
+        assert [item['id'] for item in data] == [first]
+        data = client.get(
+            self.LEADERBOARD_URL, {'category': categories[1]['slug']}).json()
+        assert [item['id'] for item in data] == [second]
+
+        with CaptureQueriesContext(connection) as context:
+            client.get(self.LEADERBOARD_URL)
+        assert len(context) == 1, (
+            f'Проверьте, что `{self.LEADERBOARD_URL}` читает рейтинг одним '
+            'запросом.'
+        )
+
+    def test_02_leaderboard_follows_reviews(self, client, admin_client,
+                                            user_client):
+        titles, _, _ = create_titles(admin_client)
+        first = titles[0]['id']
+        review = create_single_review(user_client, first, 'Хорошо', 4).json()
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=first, review_id=review['id']),
+            data={'score': 9}
+        )
+        data = client.get(self.LEADERBOARD_URL).json()
+        assert data[0]['rating'] == 9
+
+        user_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=first, review_id=review['id']))
+        assert client.get(self.LEADERBOARD_URL).json() == []
+
+        create_single_review(user_client, first, 'Хорошо', 7)
+        admin_client.delete(f'/api/v1/titles/{first}/')
+        assert client.get(self.LEADERBOARD_URL).json() == []
+
+    def test_03_rebuild_command(self, client, admin_client, user_client):
+        from reviews.models import TitleRanking
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 7)
+        TitleRanking.objects.all().delete()
+
+        call_command('rebuild_leaderboard', stdout=StringIO())
+        data = client.get(self.LEADERBOARD_URL).json()
+        assert [item['id'] for item in data] == [titles[0]['id']]
+
+    def test_04_invalid_params(self, client):
+        response = client.get(self.LEADERBOARD_URL, {'by': 'name'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(self.LEADERBOARD_URL, {'limit': 1000})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_concurrent_first_review(self, client, admin_client,
+                                        user_client, monkeypatch):
+        from reviews import rankings
+        from reviews.models import TitleRanking
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        ranked_titles = rankings._ranked_titles
+
+        def ranked_by_other_first(*args):
+            # Параллельный первый отзыв успел вставить строку рейтинга.
+            TitleRanking.objects.create(
+                scope=rankings.ALL_SCOPE, title_id=title_id, rating=1,
+                review_count=1)
+            return ranked_titles(*args)
+
+        monkeypatch.setattr(rankings, '_ranked_titles', ranked_by_other_first)
+        response = create_single_review(user_client, title_id, 'Отлично', 8)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что одновременный первый отзыв на произведение не '
+            'приводит к ошибке.'
+        )
+        monkeypatch.undo()
+        assert client.get(self.LEADERBOARD_URL).json() == [{
+            'id': title_id, 'name': titles[0]['name'],
+            'rating': 8, 'review_count': 1
+        }]
@@ -0,0 +1,184 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    GENRES_URL = '/api/v1/genres/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_etag_and_last_modified(self, client, admin_client):
+        create_titles(admin_client)
+        for url in (self.TITLES_URL, self.GENRES_URL):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.has_header('ETag'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок ETag.'
+            )
+            assert response.has_header('Last-Modified'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок Last-Modified.'
+            )
+
+    def test_02_not_modified_without_queries(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url)['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что GET-запрос с актуальным If-None-Match '
+            'возвращает ответ со статусом 304.'
+        )
+        assert not response.content
+        assert response['ETag'] == etag
+        assert len(context) == 0, (
+            'Проверьте, что ответ 304 отдаётся без запросов к базе, '
+            f'сейчас их {len(context)}.'
+        )
+
+        # Last-Modified текущей секунды не сравнивается: сдвигаем версии
+        # в прошлое.
+        from django.core.cache import cache
+
+        from api.cache import GLOBAL_VERSION_KEY, title_version_key
+        past = time.time_ns() - 10 ** 10
+        cache.set_many({
+            GLOBAL_VERSION_KEY: past, title_version_key(titles[0]['id']): past
+        })
+        modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что GET-запрос с актуальным If-Modified-Since '
+            'возвращает ответ со статусом 304.'
+        )
+
+    def test_03_etag_depends_on_query(self, client, admin_client):
+        create_titles(admin_client)
+        etag = client.get(self.TITLES_URL)['ETag']
+        response = client.get(
+            self.TITLES_URL, {'year': 1984}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag учитывает параметры запроса.'
+        )
+
+    def test_04_write_changes_etag(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        detail_url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        detail_etag = client.get(detail_url)['ETag']
+        reviews_etag = client.get(reviews_url)['ETag']
+
+        review_id = create_single_review(
+            user_client, title_id, 'Отлично', 9).json()['id']
+
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет ETag карточки произведения.'
+        )
+        assert response.json()['rating'] == 9
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет ETag списка отзывов.'
+        )
+
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id)
+        comments_etag = client.get(comments_url)['ETag']
+        reviews_etag = client.get(reviews_url)['ETag']
+        create_single_comment(user_client, title_id, review_id, 'Согласен')
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag списка '
+            'комментариев.'
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag списка отзывов: '
+            'в нём выводится число комментариев.'
+        )
+        assert response.json()['results'][0]['comment_count'] == 1
+
+    def test_05_genre_change_resets_titles(self, client, admin_client):
+        create_titles(admin_client)
+        etag = client.get(self.TITLES_URL)['ETag']
+        response = admin_client.post(
+            self.GENRES_URL, data={'name': 'Вестерн', 'slug': 'western'})
+        assert response.status_code == HTTPStatus.CREATED
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение жанров меняет ETag списка '
+            'произведений.'
+        )
+
+    def test_06_only_username_change_resets_reviews(self, client,
+                                                    admin_client, user,
+                                                    user_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'])
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        etag = client.get(reviews_url)['ETag']
+
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'})
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'bio': 'Люблю кино'})
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что регистрация и изменение профиля без смены '
+            'имени не меняют ETag списка отзывов.'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'})
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена имени автора меняет ETag списка отзывов.'
+        )
+        assert response.json()['results'][0]['author'] == 'renamed'
+
+    def test_07_missing_objects_and_same_second(self, client, admin_client,
+                                                user_client):
+        titles, _, _ = create_titles(admin_client)
+        future = http_date(time.time() + 60 * 60)
+        for url in (
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=999),
+            self.REVIEWS_URL_TEMPLATE.format(title_id=999),
+            self.COMMENTS_URL_TEMPLATE.format(title_id=999, review_id=999),
+        ):
+            response = client.get(url, HTTP_IF_MODIFIED_SINCE=future)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{url}` с If-Modified-Since '
+                'для несуществующего объекта возвращает 404, а не 304.'
+            )
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        modified = client.get(url)['Last-Modified']
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что запись в ту же секунду, что и Last-Modified, не '
+            'приводит к устаревшему ответу 304.'
+        )
+        assert response.json()['count'] == 1
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_comment, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17CommentCount:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def create_review(self, user_client):
+        from reviews.models import Title
+        title = Title.objects.create(name='Произведение', year=2000)
+        review_id = create_single_review(
+            user_client, title.id, 'Отзыв', 5).json()['id']
+        return title.id, review_id
+
+    def get_count(self, client, title_id, review_id):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        response = client.get(f'{url}{review_id}/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'comment_count' in response.json(), (
+            'Проверьте, что отзыв содержит поле `comment_count`.'
+        )
+        return response.json()['comment_count']
+
+    def test_01_create_and_delete(self, client, user_client,
+                                  moderator_client):
+        title_id, review_id = self.create_review(user_client)
+        assert self.get_count(client, title_id, review_id) == 0
+
+        comment_id = create_single_comment(
+            user_client, title_id, review_id, 'Первый').json()['id']
+        create_single_comment(moderator_client, title_id, review_id, 'Второй')
+        assert self.get_count(client, title_id, review_id) == 2, (
+            'Проверьте, что новый комментарий увеличивает `comment_count` '
+            'отзыва.'
+        )
+
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id)
+        response = user_client.patch(
+            f'{url}{comment_id}/', data={'text': 'Исправлено'},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_count(client, title_id, review_id) == 2, (
+            'Проверьте, что изменение комментария не меняет `comment_count`.'
+        )
+
+        response = user_client.delete(f'{url}{comment_id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_count(client, title_id, review_id) == 1, (
+            'Проверьте, что удаление комментария уменьшает `comment_count` '
+            'отзыва.'
+        )
+
+    def test_02_cascade(self, client, user_client, moderator,
+                        moderator_client):
+        title_id, review_id = self.create_review(user_client)
+        create_single_comment(user_client, title_id, review_id, 'Первый')
+        create_single_comment(moderator_client, title_id, review_id, 'Второй')
+
+        moderator.delete()
+        assert self.get_count(client, title_id, review_id) == 1, (
+            'Проверьте, что каскадное удаление комментариев вместе с '
+            'автором уменьшает `comment_count` отзыва.'
+        )
+
+    def test_03_recompute_repairs_drift(self, client, user_client):
+        from reviews.models import Review
+        title_id, review_id = self.create_review(user_client)
+        create_single_comment(user_client, title_id, review_id, 'Первый')
+        Review.objects.filter(pk=review_id).update(comment_count=7)
+
+        call_command('recompute_ratings', verbosity=0)
+        assert Review.objects.get(pk=review_id).comment_count == 1, (
+            'Проверьте, что команда recompute_ratings исправляет '
+            '`comment_count` отзывов.'
+        )
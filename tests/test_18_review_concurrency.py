@@ -0,0 +1,72 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ReviewConcurrency:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    WORKERS = 4
+
+    def create_title(self):
+        from reviews.models import Title
+        return Title.objects.create(name='Произведение', year=2000)
+
+    def test_01_duplicate_is_bad_request(self, user_client):
+        title = self.create_title()
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        data = {'text': 'Отзыв', 'score': 5}
+        assert user_client.post(url, data=data).status_code == (
+            HTTPStatus.CREATED)
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Если пользователь повторно оставляет отзыв на произведение - '
+            'должен вернуться ответ со статусом 400.'
+        )
+        assert 'non_field_errors' in response.json()
+        assert not any(
+            'LIMIT 1' in query['sql'] and '"author_id" =' in query['sql']
+            and query['sql'].startswith('SELECT (1)')
+            for query in context[:-1]
+        ), (
+            'Проверьте, что перед созданием отзыва не выполняется '
+            'предварительная проверка на повтор.'
+        )
+
+    def test_02_parallel_duplicates(self, user_client):
+        title = self.create_title()
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        barrier = threading.Barrier(self.WORKERS)
+
+        def post(score):
+            try:
+                barrier.wait()
+                return user_client.post(
+                    url, data={'text': 'Отзыв', 'score': score}
+                ).status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(self.WORKERS) as executor:
+            statuses = list(executor.map(post, range(1, self.WORKERS + 1)))
+
+        assert sorted(statuses) == sorted(
+            [HTTPStatus.CREATED] + [HTTPStatus.BAD_REQUEST] * (
+                self.WORKERS - 1)
+        ), (
+            'Проверьте, что из параллельных повторных POST-запросов отзыв '
+            f'создаёт ровно один, остальные получают 400: {statuses}.'
+        )
+        assert title.review.count() == 1
+        title.refresh_from_db()
+        assert title.review_count == 1, (
+            'Проверьте, что отклонённые повторы не меняют агрегаты '
+            'произведения.'
+        )
@@ -0,0 +1,116 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Export:
+
+    REVIEWS_EXPORT_URL = '/api/v1/export/reviews/'
+    COMMENTS_EXPORT_URL = '/api/v1/export/comments/'
+
+    def read_lines(self, response):
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоковым ответом.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        content = b''.join(response.streaming_content).decode()
+        assert content == '' or content.endswith('\n')
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_01_admin_only(self, client, user_client, moderator_client):
+        for url in (self.REVIEWS_EXPORT_URL, self.COMMENTS_EXPORT_URL):
+            assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED, (
+                f'Проверьте, что выгрузка `{url}` недоступна анониму.'
+            )
+            for api_client in (user_client, moderator_client):
+                response = api_client.get(url)
+                assert response.status_code == HTTPStatus.FORBIDDEN, (
+                    f'Проверьте, что выгрузка `{url}` доступна только '
+                    'администратору.'
+                )
+
+    def test_02_reviews(self, admin_client, admin, moderator,
+                        moderator_client, user, user_client):
+        authors_map = {
+            admin: admin_client,
+            moderator: moderator_client,
+            user: user_client
+        }
+        comments, reviews, titles = create_comments(
+            admin_client, authors_map)
+        rows = self.read_lines(admin_client.get(self.REVIEWS_EXPORT_URL))
+        assert [row['id'] for row in rows] == sorted(
+            review['id'] for review in reviews), (
+            'Проверьте, что выгрузка содержит все отзывы по одному на строку.'
+        )
+        assert set(rows[0]) == {
+            'id', 'title', 'text', 'author', 'score', 'pub_date',
+            'comment_count'
+        }
+        assert [row['author'] for row in rows] == [
+            review['author'] for review in reviews]
+        assert rows[0]['comment_count'] == len(comments)
+
+        for title in titles:
+            rows = self.read_lines(admin_client.get(
+                self.REVIEWS_EXPORT_URL, {'title': title['id']}))
+            assert len(rows) == (3 if title is titles[0] else 0), (
+                'Проверьте, что выгрузку отзывов можно отфильтровать по '
+                'произведению.'
+            )
+
+        category = titles[0]['category']
+        other = {title['category'] for title in titles} - {category}
+        rows = self.read_lines(admin_client.get(
+            self.REVIEWS_EXPORT_URL, {'category': category}))
+        assert len(rows) == 3
+        for slug in other:
+            rows = self.read_lines(admin_client.get(
+                self.REVIEWS_EXPORT_URL, {'category': slug}))
+            assert rows == [], (
+                'Проверьте, что выгрузку отзывов можно отфильтровать по '
+                'категории.'
+            )
+
+    def test_03_comments(self, admin_client, admin):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client})
+        rows = self.read_lines(admin_client.get(self.COMMENTS_EXPORT_URL))
+        assert [row['id'] for row in rows] == sorted(
+            comment['id'] for comment in comments)
+        assert set(rows[0]) == {
+            'id', 'title', 'review', 'text', 'author', 'pub_date'
+        }
+
+        review_id = reviews[0]['id']
+        rows = self.read_lines(admin_client.get(
+            self.COMMENTS_EXPORT_URL, {'review': review_id}))
+        assert rows and all(row['review'] == review_id for row in rows)
+        assert all(row['title'] == titles[0]['id'] for row in rows)
+
+    def test_04_pub_date_range(self, admin_client, admin):
+        create_comments(admin_client, {admin: admin_client})
+        rows = self.read_lines(admin_client.get(self.REVIEWS_EXPORT_URL))
+        first = rows[0]['pub_date']
+        rows = self.read_lines(admin_client.get(
+            self.REVIEWS_EXPORT_URL, {'pub_date_after': '2100-01-01T00:00:00Z'}))
+        assert rows == [], (
+            'Проверьте, что выгрузку можно ограничить датой публикации.'
+        )
+        rows = self.read_lines(admin_client.get(
+            self.REVIEWS_EXPORT_URL, {'pub_date_after': first}))
+        assert rows, (
+            'Проверьте, что граница диапазона дат включается в выгрузку.'
+        )
+
+        response = admin_client.get(
+            self.REVIEWS_EXPORT_URL, {'pub_date_before': 'вчера'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Если дата в фильтре выгрузки некорректна - должен вернуться '
+            'ответ со статусом 400.'
+        )
@@ -0,0 +1,181 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_comment, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ChangeFeed:
+
+    CHANGES_URL = '/api/v1/changes/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_changes(self, admin_client, **params):
+        response = admin_client.get(self.CHANGES_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос администратора к `{self.CHANGES_URL}` '
+            'возвращает ответ со статусом 200.'
+        )
+        return response.json()
+
+    def entries(self, feed):
+        return [
+            (entry['model'], entry['object_id'], entry['action'])
+            for entry in feed['results']
+        ]
+
+    def create_title(self):
+        from reviews.models import Title
+        return Title.objects.create(name='Произведение', year=2000)
+
+    def test_01_admin_only(self, client, user_client, moderator_client):
+        assert client.get(self.CHANGES_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED)
+        for api_client in (user_client, moderator_client):
+            assert api_client.get(self.CHANGES_URL).status_code == (
+                HTTPStatus.FORBIDDEN), (
+                f'Проверьте, что `{self.CHANGES_URL}` доступен только '
+                'администратору.'
+            )
+
+    def test_02_title_lifecycle(self, admin_client):
+        cursor = self.get_changes(admin_client)['next']
+        title = self.create_title()
+        feed = self.get_changes(admin_client, since=cursor)
+        assert self.entries(feed) == [('title', title.id, 'created')], (
+            'Проверьте, что создание произведения попадает в журнал '
+            'изменений.'
+        )
+
+        cursor = feed['next']
+        title.name = 'Новое название'
+        title.save()
+        title_id = title.id
+        title.delete()
+        feed = self.get_changes(admin_client, since=cursor)
+        assert self.entries(feed) == [
+            ('title', title_id, 'updated'),
+            ('title', title_id, 'deleted'),
+        ], (
+            'Проверьте, что изменение и удаление произведения попадают в '
+            'журнал изменений по порядку.'
+        )
+        seqs = [entry['seq'] for entry in feed['results']]
+        assert seqs == sorted(seqs) and seqs[0] > cursor
+
+        feed = self.get_changes(admin_client, since=feed['next'])
+        assert feed['results'] == [] and not feed['has_more']
+
+    def test_03_review_and_comment(self, admin_client, user_client):
+        title = self.create_title()
+        cursor = self.get_changes(admin_client, since=0, limit=1000)['next']
+        review_id = create_single_review(
+            user_client, title.id, 'Отзыв', 7).json()['id']
+        comment_id = create_single_comment(
+            user_client, title.id, review_id, 'Коммент').json()['id']
+        entries = self.entries(self.get_changes(admin_client, since=cursor))
+        assert ('review', review_id, 'created') in entries
+        assert ('title', title.id, 'updated') in entries, (
+            'Проверьте, что новый отзыв отмечает в журнале изменение '
+            'рейтинга произведения.'
+        )
+        assert ('comment', comment_id, 'created') in entries
+        assert entries.index(('review', review_id, 'updated')) > (
+            entries.index(('comment', comment_id, 'created'))), (
+            'Проверьте, что новый комментарий отмечает в журнале изменение '
+            'счётчика комментариев отзыва.'
+        )
+
+    def test_04_rolled_back_write_is_not_logged(self, admin_client,
+                                                user_client):
+        title = self.create_title()
+        create_single_review(user_client, title.id, 'Отзыв', 7)
+        cursor = self.get_changes(admin_client, since=0, limit=1000)['next']
+        response = user_client.post(
+            f'{self.TITLES_URL}{title.id}/reviews/',
+            data={'text': 'Повтор', 'score': 1}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        feed = self.get_changes(admin_client, since=cursor)
+        assert feed['results'] == [], (
+            'Проверьте, что запись в журнал делается в одной транзакции с '
+            'изменением и откатывается вместе с ним.'
+        )
+
+    def test_05_limit_and_model(self, admin_client):
+        cursor = self.get_changes(admin_client)['next']
+        titles = [self.create_title() for _ in range(3)]
+
+        feed = self.get_changes(admin_client, since=cursor, limit=2)
+        assert len(feed['results']) == 2 and feed['has_more'], (
+            'Проверьте, что `limit` ограничивает размер ответа, а '
+            '`has_more` сообщает об оставшихся записях.'
+        )
+        feed = self.get_changes(admin_client, since=feed['next'], limit=2)
+        assert self.entries(feed) == [('title', titles[2].id, 'created')]
+        assert not feed['has_more']
+
+        feed = self.get_changes(admin_client, since=cursor, model='genre')
+        assert feed['results'] == []
+
+        response = admin_client.get(self.CHANGES_URL, {'since': -1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.get(self.CHANGES_URL, {'model': 'user'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_06_bulk_titles(self, admin_client):
+        from reviews.models import Genre
+        Genre.objects.create(name='Драма', slug='drama')
+        title = self.create_title()
+        cursor = self.get_changes(admin_client)['next']
+        response = admin_client.post(f'{self.TITLES_URL}bulk/', data=[
+            {'name': 'Новое произведение', 'year': 2001, 'genre': ['drama']},
+            {'id': title.id, 'name': 'Новое название'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK
+        new_id = response.json()[0]['id']
+        assert self.entries(self.get_changes(admin_client, since=cursor)) == [
+            ('title', new_id, 'created'),
+            ('title', title.id, 'updated'),
+        ], (
+            'Проверьте, что массовая загрузка отмечает новые произведения '
+            'как созданные, а изменённые — как изменённые.'
+        )
+
+    def test_07_uncommitted_gap_holds_cursor(self, monkeypatch):
+        from django.db import connections
+
+        from reviews.changes import changes_since
+        from reviews.models import Change
+
+        # Снимок PostgreSQL на SQLite: самая старая незавершённая
+        # транзакция имеет номер snapshot['xmin'].
+        snapshot = {'xmin': 10}
+        connection = connections['default']
+        connection.ensure_connection()
+        connection.connection.create_function(
+            'txid_current_snapshot', 0, lambda: '')
+        connection.connection.create_function(
+            'txid_snapshot_xmin', 1, lambda _: snapshot['xmin'])
+        monkeypatch.setattr(connection, 'vendor', 'postgresql')
+        first, second, third = [
+            Change.objects.create(model='title', object_id=object_id,
+                                  action='created', horizon=horizon)
+            for object_id, horizon in ((1, 5), (2, 12), (3, 6))
+        ]
+
+        entries, has_more = changes_since(0, 10)
+        assert [entry['seq'] for entry in entries] == [first.seq], (
+            'Проверьте, что журнал не отдаёт записи, которые могли обогнать '
+            'незакоммиченные транзакции, и всё, что идёт после них.'
+        )
+        assert not has_more
+
+        snapshot['xmin'] = 20
+        entries, _ = changes_since(first.seq, 10)
+        assert [entry['seq'] for entry in entries] == [
+            second.seq, third.seq], (
+            'Проверьте, что записи выдаются, когда старые транзакции '
+            'завершились.'
+        )
@@ -0,0 +1,200 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Moderation:
+
+    MODERATION_URL = '/api/v1/moderation/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def create_title(self, name='Произведение'):
+        from reviews.models import Title
+        return Title.objects.create(name=name, year=2000)
+
+    def create_reviews(self, django_user_model, title, scores,
+                       prefix='author'):
+        from reviews.models import Review
+        reviews = []
+        for idx, score in enumerate(scores):
+            author, _ = django_user_model.objects.get_or_create(
+                username=f'{prefix}_{idx}',
+                defaults={'email': f'{prefix}_{idx}@yamdb.fake'}
+            )
+            reviews.append(Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score))
+        return reviews
+
+    def moderate(self, api_client, **data):
+        response = api_client.post(self.MODERATION_URL, data, format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос модератора к '
+            f'`{self.MODERATION_URL}` с корректными данными возвращает '
+            f'ответ со статусом 200: {response.json()}.'
+        )
+        return response.json()
+
+    def test_01_permissions(self, client, user_client, moderator_client,
+                            admin_client):
+        data = {'action': 'delete', 'review_ids': [1]}
+        assert client.post(self.MODERATION_URL, data).status_code == (
+            HTTPStatus.UNAUTHORIZED)
+        response = user_client.post(self.MODERATION_URL, data, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что массовая модерация недоступна обычному '
+            'пользователю.'
+        )
+        for api_client in (moderator_client, admin_client):
+            response = api_client.post(
+                self.MODERATION_URL, data, format='json')
+            assert response.status_code == HTTPStatus.OK
+
+    def test_02_validation(self, moderator_client):
+        for data in (
+            {'action': 'delete'},
+            {'action': 'purge', 'review_ids': [1]},
+            {'action': 'hide', 'since': '2020-01-01T00:00:00Z',
+             'review_ids': [1]},
+            {'action': 'hide', 'author': 'nobody'},
+        ):
+            response = moderator_client.post(
+                self.MODERATION_URL, data, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что запрос {data} к `{self.MODERATION_URL}` '
+                'возвращает ответ со статусом 400.'
+            )
+
+    def test_03_delete_by_ids(self, django_user_model, moderator_client,
+                              client):
+        from reviews.models import Comment, ScoreCount
+        first, second = self.create_title('Первое'), self.create_title(
+            'Второе')
+        reviews = self.create_reviews(django_user_model, first, [10, 2, 6])
+        other = self.create_reviews(django_user_model, second, [4])
+        Comment.objects.create(
+            review=reviews[1], author=reviews[0].author, text='Коммент')
+
+        result = self.moderate(
+            moderator_client, action='delete',
+            review_ids=[reviews[1].id, other[0].id]
+        )
+        assert result == {'reviews': 2, 'comments': 0, 'titles': 2}
+        assert not Comment.objects.exists(), (
+            'Проверьте, что комментарии удалённых отзывов удаляются.'
+        )
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.review_count, first.rating) == (2, 8), (
+            'Проверьте, что после массового удаления рейтинг произведения '
+            'пересчитывается.'
+        )
+        assert (second.review_count, second.rating) == (0, None)
+        assert not ScoreCount.objects.filter(
+            title=first, score=2, count__gt=0).exists()
+        response = client.get(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=first.id))
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что массовое удаление сбрасывает кэш произведения.'
+        )
+
+    def test_04_hide_by_author_window(self, django_user_model,
+                                      moderator_client, client):
+        from reviews.models import Comment, Review
+        title = self.create_title()
+        spammer = django_user_model.objects.create_user(
+            username='spammer', email='spammer@yamdb.fake')
+        honest = self.create_reviews(django_user_model, title, [9])[0]
+        old = Comment.objects.create(
+            review=honest, author=spammer, text='Старый')
+        Comment.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=10))
+        Comment.objects.create(review=honest, author=spammer, text='Спам')
+        Review.objects.create(
+            title=title, author=spammer, text='Спам', score=1)
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        assert client.get(reviews_url).json()['count'] == 2
+
+        result = self.moderate(
+            moderator_client, action='hide', author='spammer',
+            since=(timezone.now() - timedelta(days=1)).isoformat()
+        )
+        assert result == {'reviews': 1, 'comments': 1, 'titles': 1}
+
+        response = client.get(reviews_url).json()
+        assert [review['id'] for review in response['results']] == [
+            honest.id], (
+            'Проверьте, что скрытые отзывы не выводятся в списке.'
+        )
+        assert response['results'][0]['comment_count'] == 1, (
+            'Проверьте, что скрытые комментарии не учитываются в '
+            '`comment_count`.'
+        )
+        comments = client.get(f'{reviews_url}{honest.id}/comments/').json()
+        assert [comment['text'] for comment in comments['results']] == [
+            'Старый'], (
+            'Проверьте, что скрытые комментарии не выводятся, а '
+            'комментарии вне периода остаются.'
+        )
+        title.refresh_from_db()
+        assert (title.review_count, title.rating) == (1, 9), (
+            'Проверьте, что скрытые отзывы не учитываются в рейтинге.'
+        )
+        assert Review.objects.filter(author=spammer, is_hidden=True).exists()
+
+    def test_05_constant_queries(self, django_user_model, moderator_client):
+        counts = {}
+        # Модератор заранее попадает в кэш аутентификации.
+        moderator_client.get('/api/v1/users/me/')
+        for action in ('hide', 'delete'):
+            for size in (1, 5):
+                title = self.create_title(f'{action} {size}')
+                reviews = self.create_reviews(
+                    django_user_model, title, [5] * size,
+                    prefix=f'{action}_{size}'
+                )
+                with CaptureQueriesContext(connection) as context:
+                    self.moderate(
+                        moderator_client, action=action,
+                        review_ids=[review.id for review in reviews]
+                    )
+                counts[action, size] = len(context)
+            assert counts[action, 1] == counts[action, 5], (
+                f'Проверьте, что действие {action} выполняется одним '
+                'набором запросов независимо от числа отзывов: '
+                f'{counts[action, 1]} и {counts[action, 5]}.'
+            )
+
+    def test_06_stale_save_keeps_hidden(self, django_user_model, admin,
+                                        moderator_client):
+        from reviews.models import Comment, Review, Title
+        title = self.create_title()
+        review, = self.create_reviews(django_user_model, title, [7])
+        comment = Comment.objects.create(
+            review=review, author=admin, text='Комментарий')
+        self.moderate(
+            moderator_client, action='hide',
+            review_ids=[review.id], comment_ids=[comment.id]
+        )
+
+        review.text = 'Исправленный отзыв'
+        review.save()
+        comment.text = 'Исправленный комментарий'
+        comment.save()
+        assert Review.objects.get(pk=review.pk).is_hidden, (
+            'Проверьте, что сохранение прочитанного до модерации отзыва не '
+            'снимает с него скрытие.'
+        )
+        assert Comment.objects.get(pk=comment.pk).is_hidden, (
+            'Проверьте, что сохранение прочитанного до модерации '
+            'комментария не снимает с него скрытие.'
+        )
+        title = Title.objects.get(pk=title.pk)
+        assert (title.review_count, title.rating) == (0, None), (
+            'Проверьте, что скрытый отзыв не возвращается в рейтинг.'
+        )
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22UserHistory:
+
+    USER_REVIEWS_URL_TEMPLATE = '/api/v1/users/{username}/reviews/'
+    USER_COMMENTS_URL_TEMPLATE = '/api/v1/users/{username}/comments/'
+
+    def create_history(self, author, count):
+        from reviews.models import Comment, Review, Title
+        reviews, comments = [], []
+        now = timezone.now()
+        for idx in range(count):
+            title = Title.objects.create(name=f'Произведение {idx}', year=2000)
+            review = Review.objects.create(
+                title=title, author=author, text=f'Отзыв {idx}', score=5)
+            comment = Comment.objects.create(
+                review=review, author=author, text=f'Коммент {idx}')
+            pub_date = now - timedelta(days=count - idx)
+            Review.objects.filter(pk=review.pk).update(pub_date=pub_date)
+            Comment.objects.filter(pk=comment.pk).update(pub_date=pub_date)
+            reviews.append(review)
+            comments.append(comment)
+        return reviews[::-1], comments[::-1]
+
+    def collect(self, api_client, url):
+        items = []
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+                'статусом 200.'
+            )
+            data = response.json()
+            assert 'count' not in data and 'next' in data, (
+                'Проверьте, что история пользователя разбита на страницы '
+                'курсорной пагинацией.'
+            )
+            items.extend(data['results'])
+            url = data['next']
+        return items
+
+    def test_01_reviews_newest_first(self, client, user):
+        reviews, _ = self.create_history(user, 7)
+        items = self.collect(client, self.USER_REVIEWS_URL_TEMPLATE.format(
+            username=user.username))
+        assert [item['id'] for item in items] == [
+            review.id for review in reviews], (
+            'Проверьте, что история отзывов пользователя содержит все его '
+            'отзывы, новые первыми.'
+        )
+        assert items[0]['title'] == reviews[0].title_id
+        assert items[0]['author'] == user.username
+
+    def test_02_comments(self, client, user):
+        _, comments = self.create_history(user, 6)
+        items = self.collect(client, self.USER_COMMENTS_URL_TEMPLATE.format(
+            username=user.username))
+        assert [item['id'] for item in items] == [
+            comment.id for comment in comments]
+        assert items[0]['review'] == comments[0].review_id
+        assert items[0]['title'] == comments[0].review.title_id
+
+    def test_03_me(self, client, user_client, user, admin):
+        reviews, _ = self.create_history(user, 2)
+        self.create_history(admin, 1)
+        url = self.USER_REVIEWS_URL_TEMPLATE.format(username='me')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что `{url}` недоступен анониму.'
+        )
+        items = self.collect(user_client, url)
+        assert [item['id'] for item in items] == [
+            review.id for review in reviews], (
+            f'Проверьте, что `{url}` возвращает отзывы текущего '
+            'пользователя.'
+        )
+        items = self.collect(
+            user_client,
+            self.USER_COMMENTS_URL_TEMPLATE.format(username='me')
+        )
+        assert len(items) == 2
+
+    def test_04_hidden_and_missing(self, client, user):
+        from reviews.models import Review
+        reviews, _ = self.create_history(user, 3)
+        Review.objects.filter(pk=reviews[0].pk).update(is_hidden=True)
+        items = self.collect(client, self.USER_REVIEWS_URL_TEMPLATE.format(
+            username=user.username))
+        assert reviews[0].id not in [item['id'] for item in items], (
+            'Проверьте, что скрытые отзывы не выводятся в истории.'
+        )
+        items = self.collect(client, self.USER_COMMENTS_URL_TEMPLATE.format(
+            username=user.username))
+        assert len(items) == 2, (
+            'Проверьте, что комментарии к скрытым отзывам не выводятся в '
+            'истории.'
+        )
+        response = client.get(
+            self.USER_REVIEWS_URL_TEMPLATE.format(username='nobody'))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_composite_index(self, user):
+        from reviews.models import Comment, Review
+        for model, index in (
+            (Review, 'review_author_pub_date_idx'),
+            (Comment, 'comment_author_pub_date_idx'),
+        ):
+            plan = model.objects.filter(author=user).order_by(
+                '-pub_date', 'id').explain()
+            assert index in plan, (
+                f'Проверьте, что выборка истории использует индекс {index}: '
+                f'{plan}'
+            )
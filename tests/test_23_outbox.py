@@ -0,0 +1,142 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.utils import timezone
+
+from tests.utils import deliver_outbox
+
+
+class CountingBackend(EmailBackend):
+    """locmem-бэкенд, который считает соединения и падает по запросу."""
+
+    opened = 0
+    fail_recipients = set()
+    fail_open = False
+
+    def open(self):
+        if CountingBackend.fail_open:
+            raise ConnectionRefusedError('SMTP недоступен')
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & CountingBackend.fail_recipients:
+                raise ConnectionResetError('Письмо не принято')
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def counting_backend(settings):
+    settings.EMAIL_BACKEND = 'tests.test_23_outbox.CountingBackend'
+    settings.OUTBOX_RETRY_DELAY = 60
+    settings.OUTBOX_MAX_ATTEMPTS = 2
+    CountingBackend.opened = 0
+    CountingBackend.fail_recipients = set()
+    CountingBackend.fail_open = False
+    return CountingBackend
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Outbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def signup(self, client, idx):
+        response = client.post(self.URL_SIGNUP, data={
+            'email': f'user_{idx}@yamdb.fake', 'username': f'user_{idx}'})
+        assert response.status_code == HTTPStatus.OK
+        return f'user_{idx}@yamdb.fake'
+
+    def test_01_signup_enqueues(self, client, counting_backend):
+        from reviews.models import OutgoingEmail
+        outbox_before = len(mail.outbox)
+        email = self.signup(client, 0)
+        assert len(mail.outbox) == outbox_before, (
+            'Проверьте, что регистрация не отправляет письмо сама, а '
+            'ставит его в очередь.'
+        )
+        queued = OutgoingEmail.objects.get()
+        assert queued.recipient == email and queued.sent_at is None
+
+        deliver_outbox()
+        assert [message.to for message in mail.outbox[outbox_before:]] == [
+            [email]]
+        queued.refresh_from_db()
+        assert queued.sent_at is not None, (
+            'Проверьте, что отправленное письмо помечается в очереди.'
+        )
+        deliver_outbox()
+        assert len(mail.outbox) == outbox_before + 1, (
+            'Проверьте, что письмо не отправляется повторно.'
+        )
+
+    def test_02_one_connection_per_batch(self, client, counting_backend,
+                                         settings):
+        settings.OUTBOX_BATCH_SIZE = 10
+        for idx in range(5):
+            self.signup(client, idx)
+        deliver_outbox()
+        assert len(mail.outbox) == 5
+        assert counting_backend.opened == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение '
+            f'с почтовым сервером, сейчас их {counting_backend.opened}.'
+        )
+
+    def test_03_retry_with_backoff(self, client, counting_backend):
+        from reviews.models import OutgoingEmail
+        good = self.signup(client, 0)
+        bad = self.signup(client, 1)
+        counting_backend.fail_recipients = {bad}
+
+        started = timezone.now()
+        deliver_outbox()
+        assert [message.to for message in mail.outbox] == [[good]], (
+            'Проверьте, что ошибка одного письма не мешает отправке '
+            'остальных.'
+        )
+        failed = OutgoingEmail.objects.get(recipient=bad)
+        assert failed.attempts == 1 and failed.sent_at is None
+        assert failed.next_attempt_at >= started + timezone.timedelta(
+            seconds=60), (
+            'Проверьте, что неудачное письмо откладывается на время '
+            'OUTBOX_RETRY_DELAY.'
+        )
+        assert 'Письмо не принято' in failed.last_error
+
+        deliver_outbox()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отложенное письмо не отправляется раньше срока.'
+        )
+
+        OutgoingEmail.objects.filter(pk=failed.pk).update(
+            next_attempt_at=timezone.now())
+        deliver_outbox()
+        failed.refresh_from_db()
+        assert failed.attempts == 2
+        assert failed.next_attempt_at - timezone.now() > timezone.timedelta(
+            seconds=100), (
+            'Проверьте, что задержка повтора растёт с каждой попыткой.'
+        )
+
+        OutgoingEmail.objects.filter(pk=failed.pk).update(
+            next_attempt_at=timezone.now())
+        counting_backend.fail_recipients = set()
+        deliver_outbox()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что после OUTBOX_MAX_ATTEMPTS попыток письмо больше '
+            'не отправляется.'
+        )
+
+    def test_04_mail_server_down(self, client, counting_backend):
+        from reviews.models import OutgoingEmail
+        counting_backend.fail_open = True
+        self.signup(client, 0)
+        deliver_outbox()
+        queued = OutgoingEmail.objects.get()
+        assert queued.attempts == 1 and queued.sent_at is None, (
+            'Проверьте, что недоступность почтового сервера откладывает '
+            'письма, а не теряет их.'
+        )
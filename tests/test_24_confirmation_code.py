@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import deliver_outbox
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ConfirmationCode:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def signup(self, client, username='code_user'):
+        response = client.post(self.URL_SIGNUP, data={
+            'email': f'{username}@yamdb.fake', 'username': username})
+        assert response.status_code == HTTPStatus.OK
+        deliver_outbox()
+        return mail.outbox[-1].body
+
+    def test_01_code_from_email_issues_token(self, client):
+        code = self.signup(client)
+        data = {'username': 'code_user', 'confirmation_code': code}
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что код из письма позволяет получить токен.'
+        )
+        assert 'token' in response.json()
+        writes = [
+            query['sql'] for query in context.captured_queries
+            if not query['sql'].lstrip().upper().startswith('SELECT')
+        ]
+        assert writes == [], (
+            'Проверьте, что проверка кода подтверждения не пишет в базу '
+            f'данных: {writes}.'
+        )
+
+    def test_02_foreign_or_broken_code(self, client):
+        code = self.signup(client)
+        self.signup(client, 'other_user')
+        for username, confirmation_code in (
+            ('other_user', code),
+            ('code_user', code[:-1]),
+            ('code_user', 'XXXX'),
+        ):
+            response = client.post(self.URL_TOKEN, data={
+                'username': username, 'confirmation_code': confirmation_code})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что код `{confirmation_code}` не подходит '
+                f'пользователю `{username}`.'
+            )
+
+    def test_03_expired_code(self, client, settings, monkeypatch):
+        code = self.signup(client)
+        settings.PASSWORD_RESET_TIMEOUT = 60
+        monkeypatch.setattr(
+            default_token_generator, '_now',
+            lambda: datetime.now() + timedelta(seconds=120)
+        )
+        response = client.post(self.URL_TOKEN, data={
+            'username': 'code_user', 'confirmation_code': code})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что просроченный код подтверждения не принимается.'
+        )
@@ -0,0 +1,75 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+USER_LOOKUP = re.compile(r'FROM "reviews_user" WHERE')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25CachedAuth:
+
+    READ_URL = '/api/v1/users/me/reviews/'
+    GENRES_URL = '/api/v1/genres/'
+    USERS_ME_URL = '/api/v1/users/me/'
+    USER_DETAIL_URL_TEMPLATE = '/api/v1/users/{username}/'
+
+    def user_lookups(self, api_client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return [
+            query['sql'] for query in context.captured_queries
+            if USER_LOOKUP.search(query['sql'])
+        ]
+
+    def test_01_steady_state_skips_user_table(self, user_client):
+        assert len(self.user_lookups(user_client, self.READ_URL)) == 1
+        lookups = self.user_lookups(user_client, self.READ_URL)
+        assert lookups == [], (
+            'Проверьте, что повторный запрос с тем же токеном не читает '
+            f'таблицу пользователей: {lookups}.'
+        )
+
+    def test_02_role_change_invalidates(self, user_client, admin_client,
+                                        user):
+        data = {'name': 'Вестерн', 'slug': 'western'}
+        self.user_lookups(user_client, self.READ_URL)
+        response = user_client.post(self.GENRES_URL, data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.patch(
+            self.USER_DETAIL_URL_TEMPLATE.format(username=user.username),
+            data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.post(self.GENRES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что смена роли пользователя сразу сбрасывает его '
+            'запись в кэше аутентификации.'
+        )
+
+    def test_03_deletion_invalidates(self, user_client, admin_client, user):
+        self.user_lookups(user_client, self.READ_URL)
+        response = admin_client.delete(
+            self.USER_DETAIL_URL_TEMPLATE.format(username=user.username))
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = user_client.get(self.READ_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удалённого пользователя перестаёт '
+            'действовать.'
+        )
+
+    def test_04_me_from_cached_user(self, user_client, user):
+        self.user_lookups(user_client, self.READ_URL)
+        response = user_client.patch(
+            self.USERS_ME_URL, data={'bio': 'Обо мне'}, format='json')
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.get(self.USERS_ME_URL)
+        assert response.json()['bio'] == 'Обо мне'
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что /users/me/ возвращает полные данные '
+            'пользователя.'
+        )
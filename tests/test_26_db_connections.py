@@ -0,0 +1,44 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26DbConnections:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_unusable_connection_is_replaced(self, client, monkeypatch):
+        from api_yamdb.db import check_connections
+        connection.ensure_connection()
+        monkeypatch.setitem(connection.settings_dict, 'CONN_HEALTH_CHECKS',
+                            True)
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        check_connections()
+        assert connection.connection is None, (
+            'Проверьте, что сохранённое соединение, которое не отвечает, '
+            'закрывается в начале запроса.'
+        )
+        monkeypatch.undo()
+        assert client.get(self.TITLES_URL).status_code == HTTPStatus.OK
+
+    def test_02_checks_can_be_disabled(self, monkeypatch):
+        from api_yamdb.db import check_connections
+        connection.ensure_connection()
+        monkeypatch.setitem(connection.settings_dict, 'CONN_HEALTH_CHECKS',
+                            False)
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        check_connections()
+        assert connection.connection is not None, (
+            'Проверьте, что при CONN_HEALTH_CHECKS=False соединение не '
+            'проверяется.'
+        )
+
+    def test_03_sqlite_by_default(self, settings):
+        database = settings.DATABASES['default']
+        assert database['ENGINE'] == 'django.db.backends.sqlite3'
+        assert database['CONN_MAX_AGE'] == 0, (
+            'Проверьте, что без переменных окружения соединения не '
+            'сохраняются между запросами.'
+        )
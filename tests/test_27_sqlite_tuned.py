@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+
+import pytest
+from django.db import OperationalError, connection
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27SqliteTuned:
+
+    def make_wrapper(self, path, **settings):
+        from api_yamdb.sqlite_tuned.base import DatabaseWrapper
+        return DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': str(path), **settings},
+            alias='tuned'
+        )
+
+    def lock_database(self, path, **kwargs):
+        """Соединение в обход Django, держащее блокировку на запись."""
+        holder = sqlite3.connect(path, isolation_level=None, **kwargs)
+        holder.execute('PRAGMA journal_mode = WAL')
+        holder.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        holder.execute('BEGIN IMMEDIATE')
+        return holder
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_01_pragmas(self, tmp_path):
+        wrapper = self.make_wrapper(
+            tmp_path / 'db.sqlite3', PRAGMAS={'busy_timeout': 1234})
+        try:
+            assert self.pragma(wrapper, 'journal_mode') == 'wal', (
+                'Проверьте, что новое соединение включает WAL.'
+            )
+            assert self.pragma(wrapper, 'synchronous') == 1
+            assert self.pragma(wrapper, 'cache_size') == -64000
+            assert self.pragma(wrapper, 'busy_timeout') == 1234, (
+                'Проверьте, что PRAGMA можно переопределить в настройках '
+                'базы.'
+            )
+        finally:
+            wrapper.close()
+
+    def test_02_transaction_takes_write_lock(self, tmp_path):
+        path = tmp_path / 'db.sqlite3'
+        wrapper = self.make_wrapper(path)
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        other = sqlite3.connect(path, timeout=0, isolation_level=None)
+        try:
+            wrapper.set_autocommit(
+                False, force_begin_transaction_with_broken_autocommit=True)
+            with pytest.raises(sqlite3.OperationalError, match='locked'):
+                other.execute('INSERT INTO item DEFAULT VALUES')
+            wrapper.rollback()
+            wrapper.set_autocommit(True)
+        finally:
+            other.close()
+            wrapper.close()
+
+    def test_03_retries_lock_contention(self, tmp_path):
+        path = tmp_path / 'db.sqlite3'
+        holder = self.lock_database(path, check_same_thread=False)
+        threading.Timer(0.3, holder.commit).start()
+        wrapper = self.make_wrapper(
+            path, PRAGMAS={'busy_timeout': 10}, LOCK_RETRIES=6)
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute('INSERT INTO item DEFAULT VALUES')
+                cursor.execute('SELECT COUNT(*) FROM item')
+                assert cursor.fetchone()[0] == 1, (
+                    'Проверьте, что запрос, упёршийся в блокировку, '
+                    'повторяется.'
+                )
+        finally:
+            wrapper.close()
+            holder.close()
+
+    def test_04_gives_up_after_retries(self, tmp_path):
+        path = tmp_path / 'db.sqlite3'
+        holder = self.lock_database(path)
+        wrapper = self.make_wrapper(
+            path, PRAGMAS={'busy_timeout': 0}, LOCK_RETRIES=1)
+        try:
+            with pytest.raises(OperationalError, match='locked'):
+                with wrapper.cursor() as cursor:
+                    cursor.execute('INSERT INTO item DEFAULT VALUES')
+        finally:
+            wrapper.close()
+            holder.close()
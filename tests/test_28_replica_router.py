@@ -0,0 +1,79 @@
+import pytest
+from django.test import RequestFactory
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica_1', 'replica_2']
+    settings.REPLICA_STICKY_SECONDS = 5
+    return settings.DATABASE_REPLICAS
+
+
+class Test28ReplicaRouter:
+
+    def route(self, method='get', writes=False, token=None):
+        """Базы, выбранные для чтения в запросе: до записи и после неё."""
+        from api_yamdb.db import ReplicaMiddleware, ReplicaRouter
+        router = ReplicaRouter()
+        reads = []
+
+        def view(request):
+            reads.append(router.db_for_read(None))
+            if writes:
+                router.db_for_write(None)
+                reads.append(router.db_for_read(None))
+            return None
+
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        request = getattr(RequestFactory(), method)('/api/v1/titles/',
+                                                    **headers)
+        ReplicaMiddleware(view)(request)
+        return reads
+
+    def test_01_safe_requests_read_replicas(self, replicas):
+        from api_yamdb.db import ReplicaRouter
+        assert self.route()[0] in replicas, (
+            'Проверьте, что безопасный запрос читает с реплики.'
+        )
+        assert self.route('head')[0] in replicas
+        assert ReplicaRouter().db_for_read(None) is None, (
+            'Проверьте, что вне HTTP-запроса чтение идёт с основной базы.'
+        )
+
+    def test_02_writes_use_primary(self, replicas):
+        assert self.route('post') == [None], (
+            'Проверьте, что небезопасный запрос читает с основной базы.'
+        )
+        reads = self.route(writes=True)
+        assert reads[0] in replicas and reads[1] is None, (
+            'Проверьте, что после записи чтения в том же запросе идут на '
+            'основную базу.'
+        )
+
+    def test_03_sticky_after_own_write(self, replicas):
+        from django.core.cache import cache
+        self.route('post', writes=True, token='author')
+        assert self.route(token='author') == [None], (
+            'Проверьте, что после своей записи клиент читает с основной '
+            'базы.'
+        )
+        assert self.route(token='other')[0] in replicas, (
+            'Проверьте, что запись одного клиента не переводит на основную '
+            'базу остальных.'
+        )
+        assert self.route()[0] in replicas
+        cache.clear()
+        assert self.route(token='author')[0] in replicas, (
+            'Проверьте, что закрепление за основной базой ограничено '
+            'REPLICA_STICKY_SECONDS.'
+        )
+
+    def test_04_without_replicas(self, settings):
+        from api_yamdb.db import ReplicaRouter
+        settings.DATABASE_REPLICAS = []
+        assert self.route() == [None]
+        assert ReplicaRouter().allow_migrate('default', 'reviews')
+
+    def test_05_no_migrations_on_replicas(self, replicas):
+        from api_yamdb.db import ReplicaRouter
+        assert not ReplicaRouter().allow_migrate('replica_1', 'reviews')
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29AsyncReads:
+
+    GENRES_URL = '/api/v1/genres/'
+    EXPORT_URL = '/api/v1/export/reviews/'
+
+    @pytest.fixture
+    def genre_view(self, settings, monkeypatch):
+        """Представление жанров в режиме ASGI, запоминающее потоки."""
+        from api.views import GenreViewSet
+        settings.ASYNC_READS = True
+        threads = {}
+        for action in ('list', 'create'):
+            method = getattr(GenreViewSet, action)
+
+            def record(self, request, *args, __action=action, __method=method,
+                       **kwargs):
+                threads[__action] = threading.get_ident()
+                return __method(self, request, *args, **kwargs)
+
+            monkeypatch.setattr(GenreViewSet, action, record)
+        view = GenreViewSet.as_view({'get': 'list', 'post': 'create'})
+        view.threads = threads
+        return view
+
+    def test_01_view_is_async(self, genre_view):
+        from api.views import GenreViewSet
+        assert asyncio.iscoroutinefunction(genre_view), (
+            'Проверьте, что при ASYNC_READS представления чтения '
+            'асинхронные.'
+        )
+        assert genre_view.cls is GenreViewSet and genre_view.csrf_exempt
+
+    def test_02_sync_without_flag(self, settings):
+        from api.views import GenreViewSet
+        settings.ASYNC_READS = False
+        view = GenreViewSet.as_view({'get': 'list'})
+        assert not asyncio.iscoroutinefunction(view), (
+            'Проверьте, что под WSGI представления остаются синхронными.'
+        )
+
+    def test_03_reads_in_pool_writes_in_main_thread(self, genre_view,
+                                                    token_admin):
+        factory = RequestFactory()
+        response = async_to_sync(genre_view)(factory.post(
+            self.GENRES_URL, {'name': 'Вестерн', 'slug': 'western'},
+            HTTP_AUTHORIZATION=f'Bearer {token_admin["access"]}'
+        ))
+        assert response.status_code == HTTPStatus.CREATED
+        response = async_to_sync(genre_view)(factory.get(self.GENRES_URL))
+        assert response.status_code == HTTPStatus.OK
+        assert response.is_rendered
+        assert response.data['results'] == [
+            {'name': 'Вестерн', 'slug': 'western'}]
+
+        main = threading.get_ident()
+        assert genre_view.threads['create'] == main, (
+            'Проверьте, что запись выполняется синхронно, в общем потоке.'
+        )
+        assert genre_view.threads['list'] != main, (
+            'Проверьте, что чтение выполняется в пуле потоков.'
+        )
+
+    def test_04_reads_run_concurrently(self, genre_view, monkeypatch):
+        from api.views import GenreViewSet
+        barrier = threading.Barrier(2, timeout=5)
+        method = GenreViewSet.list
+
+        def wait_for_other(self, request, *args, **kwargs):
+            barrier.wait()
+            return method(self, request, *args, **kwargs)
+
+        monkeypatch.setattr(GenreViewSet, 'list', wait_for_other)
+        view = GenreViewSet.as_view({'get': 'list'})
+        factory = RequestFactory()
+
+        async def read_twice():
+            return await asyncio.gather(
+                view(factory.get(self.GENRES_URL)),
+                view(factory.get(self.GENRES_URL)),
+            )
+
+        responses = async_to_sync(read_twice)()
+        assert [response.status_code for response in responses] == [
+            HTTPStatus.OK, HTTPStatus.OK], (
+            'Проверьте, что GET-запросы под ASGI выполняются параллельно.'
+        )
+
+    def test_05_not_modified(self, genre_view):
+        factory = RequestFactory()
+        response = async_to_sync(genre_view)(factory.get(self.GENRES_URL))
+        assert response.status_code == HTTPStatus.OK
+        response = async_to_sync(genre_view)(factory.get(
+            self.GENRES_URL, HTTP_IF_NONE_MATCH=response['ETag']))
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при ASYNC_READS условный GET отвечает 304.'
+        )
+
+    def test_06_export_under_asgi(self, admin_client, admin, token_admin):
+        from django.core.handlers.asgi import ASGIHandler
+        reviews, _ = create_reviews(admin_client, {admin: admin_client})
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': self.EXPORT_URL,
+            'query_string': b'',
+            'headers': [(
+                b'authorization', f'Bearer {token_admin["access"]}'.encode()
+            )],
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            messages.append(message)
+
+        async_to_sync(ASGIHandler())(scope, receive, send)
+        assert messages[0]['status'] == HTTPStatus.OK
+        body = b''.join(message.get('body', b'') for message in messages[1:])
+        assert [
+            json.loads(line)['id'] for line in body.decode().splitlines()
+        ] == [review['id'] for review in reviews], (
+            'Проверьте, что выгрузка работает под ASGI.'
+        )
@@ -0,0 +1,123 @@
+import csv
+import datetime
+import io
+import os
+import uuid
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from tests.conftest import MANAGE_PATH
+from tests.utils import create_reviews
+
+TITLES_CSV = os.path.join(MANAGE_PATH, 'static', 'data', 'titles.csv')
+
+
+@pytest.fixture(params=['orjson', 'fallback'])
+def fast_json(request, monkeypatch):
+    """Рендерер и парсер с orjson и без него."""
+    from api import parsers, renderers
+    if request.param == 'fallback':
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+    elif renderers.orjson is None:
+        pytest.skip('orjson не установлен')
+    return renderers.FastJSONRenderer(), parsers.FastJSONParser()
+
+
+def sample_data():
+    with open(TITLES_CSV, encoding='utf-8') as file:
+        titles = list(csv.DictReader(file))
+    moment = datetime.datetime(
+        2023, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+    return {
+        'results': titles,
+        'pub_date': moment,
+        'naive': moment.replace(tzinfo=None),
+        'date': moment.date(),
+        'time': moment.time().replace(microsecond=0),
+        'duration': datetime.timedelta(days=1, seconds=5),
+        'decimal': Decimal('7.50'),
+        'uuid': uuid.UUID(int=1),
+        'lazy': gettext_lazy('Рейтинг'),
+        'separators': 'строка\u2028абзац\u2029\n\t"\\\x00/',
+        'emoji': '😀',
+        'numbers': [0, -1, 2 ** 63 - 1, 7.5, 0.1, True, None],
+        'nested': [(1, 2), {'a': []}],
+    }
+
+
+class Test30Json:
+
+    def test_01_identical_output(self, fast_json):
+        renderer, _ = fast_json
+        for data in (
+            sample_data(),
+            {'big': 2 ** 70},
+            {1: 'нестроковый ключ'},
+            [],
+            'Побег из Шоушенка',
+        ):
+            assert renderer.render(data) == JSONRenderer().render(data), (
+                'Проверьте, что быстрый рендерер отдаёт те же байты, что '
+                'и JSONRenderer.'
+            )
+        assert renderer.render(None) == b''
+        assert renderer.render(
+            sample_data(), 'application/json; indent=4'
+        ) == JSONRenderer().render(
+            sample_data(), 'application/json; indent=4')
+
+    def test_02_unknown_type(self, fast_json):
+        renderer, _ = fast_json
+        with pytest.raises(TypeError):
+            renderer.render({'object': object()})
+
+    def test_03_identical_parsing(self, fast_json):
+        _, parser = fast_json
+        for body in (
+            JSONRenderer().render(sample_data()),
+            b'{"a": 1, "a": 2}',
+            b'{"big": 123456789012345678901234567890}',
+            b'[-9223372036854775809, 18446744073709551616]',
+            b'[1.5e300, -0.0, "\\u2028", "\\ud83d\\ude00"]',
+        ):
+            assert parser.parse(io.BytesIO(body)) == (
+                JSONParser().parse(io.BytesIO(body))
+            ), 'Проверьте, что быстрый парсер разбирает JSON как JSONParser.'
+
+    def test_04_parse_errors(self, fast_json):
+        _, parser = fast_json
+        for body in (b'', b'{"a": }', b'[NaN]', b'\xef\xbb\xbf{}'):
+            with pytest.raises(ParseError) as expected:
+                JSONParser().parse(io.BytesIO(body))
+            with pytest.raises(ParseError) as error:
+                parser.parse(io.BytesIO(body))
+            assert str(error.value) == str(expected.value), (
+                'Проверьте, что ошибка разбора та же, что у JSONParser.'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_api_uses_fast_json(self, fast_json, admin_client, admin):
+        from api.renderers import FastJSONRenderer
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        response = admin_client.post(
+            '/api/v1/genres/', {'name': 'Вестерн', 'slug': 'western'},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что API принимает тело в JSON.'
+        )
+        response = admin_client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        assert isinstance(response.accepted_renderer, FastJSONRenderer), (
+            'Проверьте, что FastJSONRenderer указан в '
+            'DEFAULT_RENDERER_CLASSES.'
+        )
+        assert response.content == JSONRenderer().render(response.data)
@@ -1,5 +1,7 @@
 from http import HTTPStatus
 
+from django.core.management import call_command
+
 check_name_and_slug_patterns = (
     (
         {
@@ -304,3 +306,8 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def deliver_outbox():
+    """Отправляет письма из очереди, как это делает обработчик."""
+    call_command('send_outbox', verbosity=0)